@@ -1,25 +1,57 @@
 import os
 import json
 import curses
-from pathlib import Path
-import zipfile
+import hmac
+import hashlib
+import threading
+import struct
+import io
 import tempfile
+import contextlib
+from pathlib import Path
 import datetime
 
-from .crypto import CryptoManager
+from .crypto import CryptoManager, MissingBackendError, atomic_write, wipe_buffer
 from .password_generator import PasswordGenerator
 from .clipboard import ClipboardManager
+from .entries import EntriesView, empty_columns, columns_from_data
 from .ui.main_menu import MainMenu
 from .ui.password_entry import AddEntryWindow, ViewEntriesWindow, EntryDetailsWindow, EditEntryWindow
 from .ui.password_generator import PasswordGeneratorWindow
 from .ui.settings import SettingsWindow
 from . import __version__
-from .ui.base import BaseWindow
+from .ui.base import BaseWindow, DISMISS_KEYS, forget_clipboard
+
+# Delete confirmation: y/Y confirms, n/N or Escape backs out
+YES_KEYS = frozenset((ord('y'), ord('Y')))
+CONFIRM_KEYS = YES_KEYS | {ord('n'), ord('N'), 27}
+
+
+class _ChainReader:
+    """Read-only file object that reads several binary files one after another"""
+    
+    def __init__(self, files):
+        self._files = list(files)
+    
+    def read(self, size=-1):
+        while self._files:
+            chunk = self._files[0].read(size)
+            if chunk:
+                return chunk
+            self._files.pop(0)
+        return b''
 
 
 class PasswordManager:
     """Main application class - password manager"""
     
+    # Seconds of quiet after the last edit before data is written
+    SAVE_DELAY = 0.5
+    # Export frame header: lengths of settings and data blobs
+    EXPORT_FRAME = struct.Struct('<II')
+    # Archives of earlier versions were zip files
+    ZIP_MAGIC = b'PK\x03\x04'
+    
     def __init__(self):
         """Initialize password manager"""
         self.home_dir = str(Path.home())
@@ -27,14 +59,31 @@ class PasswordManager:
         self.storage_dir.mkdir(exist_ok=True)
         self.settings_file = 'settings'  # Without extension, CryptoManager will add .gpg
         self.data_file = 'passwords'
-        self.entries = []
+        self.verifier_file = self.storage_dir / 'verifier'
+        # Entries are stored column-wise, self.entries is a list-like view over them
+        self._columns = empty_columns()
         self.settings = {
             'encryption_algorithm': 'AES-256',
-            'clipboard_clear_time': 30,
-            'master_password': ''
+            'clipboard_clear_time': 30
         }
-        self._settings_crypto = None
+        # Master password lives only here, in a buffer that can be wiped, never in settings
+        self._master_password = bytearray()
+        self._crypto = None
+        # CryptoManager whose password the verifier file was written for
+        self._verifier_crypto = None
         self._settings_loaded = False
+        # Fingerprints of what is currently on disk, to skip no-op saves
+        self._settings_digest = None
+        self._entries_digest = None
+        # Deferred data writes: each edit snapshots the columns and re-arms the timer,
+        # which only ever serialises the snapshot
+        self._pending = None
+        # Set once entries were read, so exit never writes over a file that wasn't loaded
+        self._data_loaded = False
+        self._save_timer = None
+        self._save_lock = threading.Lock()
+        # Last background write failure, shown by the main menu
+        self.save_error = None
         self.load_settings()
     
     def load_settings(self):
@@ -45,116 +94,260 @@ class PasswordManager:
             try:
                 with open(json_path, 'r') as f:
                     settings = json.load(f)
+                    settings.pop('master_password', None)
                     self.settings.update(settings)
             except Exception:
                 pass
         # If master password is already set, try to decrypt
-        if self.settings['master_password']:
-            self._settings_crypto = CryptoManager(
-                password=self.settings['master_password'],
-                algorithm=self.settings.get('encryption_algorithm', 'AES-256')
-            )
+        if self._master_password:
             try:
-                data = self._settings_crypto.load_from_file(self.settings_file)
+                crypto = self._get_crypto()
+                data = crypto.load_from_file(self.settings_file)
                 if data:
+                    # Files written by older versions kept the master password inside
+                    outdated = 'master_password' in data or crypto.last_was_legacy
+                    data.pop('master_password', None)
                     self.settings.update(data)
                     self._settings_loaded = True
+                    # No digest for an outdated file, so the first save rewrites it
+                    self._settings_digest = None if outdated else self._settings_fingerprint()
             except Exception:
                 pass
     
+    def set_master_password(self, password):
+        """Replace the master password, wiping the previous buffer"""
+        self.wipe_master_password()
+        self._master_password = bytearray(password.encode('utf-8'))
+    
+    def wipe_master_password(self):
+        """Overwrite the master password buffer in place and drop cached keys"""
+        wipe_buffer(self._master_password)
+        self._master_password = bytearray()
+        # The verifier usually holds the same manager, its derived keys go as well
+        for crypto in (self._crypto, self._verifier_crypto):
+            if crypto is not None:
+                crypto.wipe_keys()
+        self._crypto = None
+        self._verifier_crypto = None
+        # A prompt left by an exception may not have dropped its paste
+        forget_clipboard()
+    
+    @property
+    def entries(self):
+        """List-like view over the entry columns"""
+        return EntriesView(self._columns)
+    
+    @entries.setter
+    def entries(self, data):
+        self._columns = columns_from_data(data)
+    
+    @staticmethod
+    def _fingerprint(*parts):
+        """Cheap digest of data about to be written"""
+        payload = json.dumps(parts, sort_keys=True).encode('utf-8')
+        return hashlib.blake2b(payload, digest_size=16).digest()
+    
+    def _password_fingerprint(self):
+        """Digest identifying the current master password"""
+        return hashlib.blake2b(self._master_password, digest_size=16).hexdigest()
+    
+    def _settings_fingerprint(self):
+        """Digest of settings together with the password they are encrypted with"""
+        return self._fingerprint(self.settings, self._password_fingerprint())
+    
+    def _entries_fingerprint(self, columns=None):
+        """Digest of entries together with the key material they are encrypted with"""
+        return self._fingerprint(
+            self._columns if columns is None else columns,
+            self._password_fingerprint(),
+            self.settings.get('encryption_algorithm', 'AES-256')
+        )
+    
+    def _get_crypto(self):
+        """Return the session encryption manager, rebuilt only when the master password changes"""
+        if self._crypto is None or self._crypto.password is not self._master_password:
+            self._crypto = CryptoManager(password=self._master_password)
+        # The algorithm only affects new writes, the derived key stays valid
+        self._crypto.algorithm = self.settings.get('encryption_algorithm', 'AES-256')
+        return self._crypto
+    
+    def load_verifier(self):
+        """Load master password verifier, None if it was never written"""
+        try:
+            with open(self.verifier_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def save_verifier(self):
+        """Write master password verifier for the current password"""
+        crypto = self._get_crypto()
+        if self._verifier_crypto is crypto:
+            return
+        atomic_write(self.verifier_file, json.dumps(CryptoManager.create_verifier(crypto.password)))
+        self._verifier_crypto = crypto
+    
     def save_settings(self):
         """Save settings to encrypted file"""
-        if not self._settings_crypto and self.settings['master_password']:
-            self._settings_crypto = CryptoManager(
-                password=self.settings['master_password'],
-                algorithm=self.settings.get('encryption_algorithm', 'AES-256')
-            )
-        if self._settings_crypto:
-            self._settings_crypto.save_to_file(self.settings, self.settings_file)
+        if self._master_password:
+            digest = self._settings_fingerprint()
+            if digest == self._settings_digest:
+                return
+            crypto = self._get_crypto()
+            if self._verifier_crypto is not crypto:
+                # New password: without a verifier login falls back to decrypting settings,
+                # so a crash before save_verifier can't leave a verifier for the old one
+                self.verifier_file.unlink(missing_ok=True)
+            crypto.save_to_file(self.settings, self.settings_file)
+            self._settings_digest = digest
+            self.save_verifier()
             # Remove open json if it existed
-            json_path = self.storage_dir / 'settings.json'
-            if json_path.exists():
-                try:
-                    os.remove(json_path)
-                except Exception:
-                    pass
+            try:
+                (self.storage_dir / 'settings.json').unlink(missing_ok=True)
+            except OSError:
+                pass
         else:
             # First run, master password is not set
-            json_path = self.storage_dir / 'settings.json'
-            with open(json_path, 'w') as f:
-                json.dump(self.settings, f)
+            atomic_write(self.storage_dir / 'settings.json', json.dumps(self.settings))
     
     def authenticate(self, stdscr):
         """User authentication"""
-        from .ui.base import BaseWindow
         window = BaseWindow(stdscr)
         settings_gpg_path = self.storage_dir / f'{self.settings_file}.gpg'
         if not settings_gpg_path.exists():
             while True:
                 window.clear()
                 window.draw_header("First run - setting master password")
-                window.draw_footer(["[Enter] - Save", "[Esc] - Exit"])
+                window.draw_footer(("[Enter] - Save", "[Esc] - Exit"))
                 password = window.get_string_input("Enter master password: ", 3, 2, mask=True)
                 if not password:
                     return False
                 confirm = window.get_string_input("Confirm password: ", 5, 2, mask=True)
                 if not confirm:
                     return False
-                if password != confirm:
+                typed = bytearray(password.encode('utf-8'))
+                retyped = bytearray(confirm.encode('utf-8'))
+                matches = hmac.compare_digest(typed, retyped)
+                wipe_buffer(typed)
+                wipe_buffer(retyped)
+                if not matches:
                     window.draw_message("Passwords do not match", window.height // 2, None, 4)
                     window.refresh()
-                    window.wait_for_key([10, 13, 27])
+                    window.wait_for_key(DISMISS_KEYS)
                     continue
-                self.settings['master_password'] = password
+                self.set_master_password(password)
                 self.save_settings()
                 return True
         else:
+            verifier = self.load_verifier()
             while True:
                 window.clear()
                 window.draw_header("Login to password manager")
-                window.draw_footer(["[Enter] - Login", "[Esc] - Exit"])
+                window.draw_footer(("[Enter] - Login", "[Esc] - Exit"))
                 password = window.get_string_input("Enter master password: ", 3, 2, mask=True)
                 if not password:
                     return False
-                # Try to decrypt settings with this password
+                secret = bytearray(password.encode('utf-8'))
+                crypto = None
+                message = "Invalid password"
+                # Try to decrypt settings with this password, wrong ones are rejected by the verifier first
                 try:
-                    crypto = CryptoManager(password=password, algorithm=self.settings.get('encryption_algorithm', 'AES-256'))
-                    data = crypto.load_from_file(self.settings_file)
-                    if data:
-                        self.settings.update(data)
-                        self.settings['master_password'] = password
-                        return True
+                    if verifier is None or CryptoManager.check_verifier(secret, verifier):
+                        crypto = CryptoManager(password=secret)
+                        data = crypto.load_from_file(self.settings_file)
+                        if data:
+                            outdated = 'master_password' in data or crypto.last_was_legacy
+                            data.pop('master_password', None)
+                            self.settings.update(data)
+                            self._master_password = crypto.password
+                            # Keep the manager so its derived key is reused for the session
+                            self._crypto = crypto
+                            # No digest for an outdated file, so it is migrated below
+                            self._settings_digest = None if outdated else self._settings_fingerprint()
+                            if verifier is None:
+                                self.save_verifier()
+                            else:
+                                self._verifier_crypto = crypto
+                            if outdated:
+                                self.save_settings()
+                            return True
+                except MissingBackendError as e:
+                    # The password may well be right, say what is missing instead
+                    message = str(e)
                 except Exception:
                     pass
-                window.draw_message("Invalid password", window.height // 2, None, 4)
+                # Nothing derived from a failed attempt stays in memory
+                if crypto is not None:
+                    crypto.wipe_keys()
+                wipe_buffer(secret)
+                window.draw_message(message, window.height // 2, None, 4)
                 window.refresh()
-                window.wait_for_key([10, 13, 27])
+                window.wait_for_key(DISMISS_KEYS)
     
     def load_data(self):
         """Load data from file"""
-        # Initialize encryption manager
-        crypto_manager = CryptoManager(
-            password=self.settings.get('master_password', ''),
-            algorithm=self.settings.get('encryption_algorithm', 'AES-256')
-        )
-        
-        # Load data
-        data = crypto_manager.load_from_file(self.data_file)
-        if data:
-            self.entries = data
-        else:
-            self.entries = []
+        crypto = self._get_crypto()
+        data = crypto.load_from_file(self.data_file)
+        # Accepts both column storage and the older list of entry dicts
+        self.entries = data
+        self._data_loaded = True
+        # Anything stored differently from the current columns is rewritten right away
+        current = data is None or (data == self._columns and not crypto.last_was_legacy)
+        self._entries_digest = self._entries_fingerprint() if current else None
+        if not current:
+            self.save_data()
     
-    def save_data(self):
-        """Save data to file"""
-        # Initialize encryption manager
-        crypto_manager = CryptoManager(
-            password=self.settings.get('master_password', ''),
-            algorithm=self.settings.get('encryption_algorithm', 'AES-256')
-        )
-        
-        # Save data
-        crypto_manager.save_to_file(self.entries, self.data_file)
+    def save_data(self, columns=None):
+        """Save data to file, the live columns unless a snapshot is given"""
+        if columns is None:
+            columns = self._columns
+        digest = self._entries_fingerprint(columns)
+        if digest == self._entries_digest:
+            return
+        self._get_crypto().save_to_file(columns, self.data_file)
+        self._entries_digest = digest
+    
+    def _schedule_save(self):
+        """Snapshot the entries and write them in the background once edits have been quiet for SAVE_DELAY"""
+        with self._save_lock:
+            self._pending = {field: list(values) for field, values in self._columns.items()}
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+        self._save_timer = threading.Timer(self.SAVE_DELAY, self._background_save)
+        self._save_timer.daemon = True
+        self._save_timer.start()
+    
+    def _background_save(self):
+        """Timer callback, a failed write stays pending and is kept in save_error for the UI"""
+        with self._save_lock:
+            # A flush may have written everything while this callback waited for the lock
+            if self._pending is None:
+                return
+            try:
+                self.save_data(self._pending)
+            except (OSError, ValueError) as e:
+                self.save_error = e
+                return
+            self._pending = None
+            self.save_error = None
+    
+    def flush_data(self):
+        """Write pending changes synchronously"""
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+        with self._save_lock:
+            self.save_data()
+            self._pending = None
+            self.save_error = None
+    
+    def close(self):
+        """Write deferred edits, then wipe the key material"""
+        try:
+            # Always flush: it waits for a running background save and is a no-op when nothing changed
+            if self._data_loaded:
+                self.flush_data()
+        finally:
+            self.wipe_master_password()
     
     def run(self, stdscr):
         """Application launch"""
@@ -169,17 +362,20 @@ class PasswordManager:
         password_generator = PasswordGenerator()
         clipboard_manager = ClipboardManager()
         
-        # Launch main menu
+        # Launch main menu, one instance keeps its selection between returns
+        main_menu = MainMenu(stdscr)
+        main_menu.header = f"Passman v{__version__}"
         while True:
-            main_menu = MainMenu(stdscr)
-            main_menu.header = f"Passman v{__version__}"
+            if self.save_error is not None:
+                self.report_save_error(stdscr)
+            main_menu.reset()
             menu_choice = main_menu.display()
             
             # Handle menu item selection
             if menu_choice == 0:  # Show entries
-                self.view_entries(stdscr, clipboard_manager)
+                self.view_entries(stdscr, password_generator, clipboard_manager)
             elif menu_choice == 1:  # Add entry
-                self.add_entry(stdscr)
+                self.add_entry(stdscr, password_generator)
             elif menu_choice == 2:  # Generate password
                 self.generate_password(stdscr, password_generator, clipboard_manager)
             elif menu_choice == 3:  # Settings
@@ -187,67 +383,74 @@ class PasswordManager:
             elif menu_choice == 4:  # Exit
                 break
     
-    def view_entries(self, stdscr, clipboard_manager):
+    def report_save_error(self, stdscr):
+        """Tell the user a background save failed; the changes are written again on the next edit or exit"""
+        window = BaseWindow(stdscr)
+        window.clear()
+        window.draw_header("Save failed")
+        window.draw_footer(("[Enter] - Continue",))
+        window.draw_message(f"Changes were not saved: {self.save_error}", window.height // 2, None, 4)
+        window.refresh()
+        window.wait_for_key(DISMISS_KEYS)
+        self.save_error = None
+    
+    def view_entries(self, stdscr, password_generator, clipboard_manager):
         """View and manage entries"""
+        view_window = ViewEntriesWindow(stdscr, self.entries)
         while True:
-            view_window = ViewEntriesWindow(stdscr, self.entries)
+            view_window.entries = self.entries
+            view_window.reset()
             selected_index = view_window.display()
             
             if selected_index is None:
                 break
+            entry = self.entries[selected_index]
+            clear_after = self.settings.get('clipboard_clear_time', 30)
                 
             # Display selected entry
-            details_window = EntryDetailsWindow(stdscr, self.entries[selected_index])
+            details_window = EntryDetailsWindow(stdscr, entry)
             details_choice = details_window.display()
             
             # Handle entry selection action
             if details_choice == 0:  # Copy login
-                clipboard_manager.copy_to_clipboard(
-                    self.entries[selected_index]['username'],
-                    clear_after=self.settings.get('clipboard_clear_time', 30)
-                )
+                clipboard_manager.copy_to_clipboard(entry['username'], clear_after=clear_after)
             elif details_choice == 1:  # Copy password
-                clipboard_manager.copy_to_clipboard(
-                    self.entries[selected_index]['password'],
-                    clear_after=self.settings.get('clipboard_clear_time', 30)
-                )
+                clipboard_manager.copy_to_clipboard(entry['password'], clear_after=clear_after)
             elif details_choice == 2:  # Copy note
-                clipboard_manager.copy_to_clipboard(
-                    self.entries[selected_index].get('note', ''),
-                    clear_after=self.settings.get('clipboard_clear_time', 30)
-                )
+                clipboard_manager.copy_to_clipboard(entry.get('note', ''), clear_after=clear_after)
             elif details_choice == 3:  # Edit entry
-                edit_window = EditEntryWindow(stdscr, self.entries[selected_index])
+                edit_window = EditEntryWindow(stdscr, entry, password_generator)
                 updated_entry = edit_window.display()
                 
                 if updated_entry:
                     self.entries[selected_index] = updated_entry
-                    self.save_data()
+                    view_window.invalidate()
+                    self._schedule_save()
             elif details_choice == 4:  # Delete entry
                 # Create base window for entry deletion confirmation
-                from .ui.base import BaseWindow
                 window = BaseWindow(stdscr)
                 
                 window.clear()
                 window.draw_header("Delete entry")
-                window.draw_footer(["[y] - Yes", "[n] - No"])
+                window.draw_footer(("[y] - Yes", "[n] - No"))
                 
-                window.draw_message(f"Are you sure you want to delete entry '{self.entries[selected_index]['service_name']}'?", window.height // 2, None, 5)
+                window.draw_message(f"Are you sure you want to delete entry '{entry['service_name']}'?", window.height // 2, None, 5)
                 window.refresh()
                 
-                key = window.wait_for_key([ord('y'), ord('Y'), ord('n'), ord('N'), 27])
-                if key in [ord('y'), ord('Y')]:
+                key = window.wait_for_key(CONFIRM_KEYS)
+                if key in YES_KEYS:
                     del self.entries[selected_index]
-                    self.save_data()
+                    view_window.invalidate()
+                    self._schedule_save()
     
-    def add_entry(self, stdscr):
+    def add_entry(self, stdscr, password_generator):
         """Add new entry"""
-        add_window = AddEntryWindow(stdscr)
+        add_window = AddEntryWindow(stdscr, password_generator)
         entry = add_window.display()
         
         if entry:
             self.entries.append(entry)
-            self.save_data()
+            self._schedule_save()
     
     def generate_password(self, stdscr, password_generator, clipboard_manager):
         """Generate password"""
@@ -262,7 +465,7 @@ class PasswordManager:
     
     def show_settings(self, stdscr):
         """Display settings"""
-        settings_window = SettingsWindow(stdscr, self.settings)
+        settings_window = SettingsWindow(stdscr, self.settings, self._master_password)
         while True:
             updated_settings = settings_window.display()
             if updated_settings == "__EXPORT__":
@@ -272,11 +475,12 @@ class PasswordManager:
                 self.import_data(stdscr)
                 continue
             elif updated_settings:
-                # If encryption algorithm changed, reencrypt data
-                if updated_settings.get('encryption_algorithm') != self.settings.get('encryption_algorithm'):
-                    self.settings = updated_settings
-                    self.save_data()
+                if settings_window.new_master_password:
+                    with self._save_lock:
+                        self.set_master_password(settings_window.new_master_password)
+                # Both saves are no-ops unless the master password, algorithm or settings changed
                 self.settings = updated_settings
+                self.flush_data()
                 self.save_settings()
                 break
             else:
@@ -284,70 +488,97 @@ class PasswordManager:
 
     def export_data(self, stdscr):
         """Экспорт данных и настроек в зашифрованный архив"""
+        # Отложенные изменения должны попасть в архив
+        self.flush_data()
         # Пути к файлам
         settings_path = self.storage_dir / f'{self.settings_file}.gpg'
         data_path = self.storage_dir / f'{self.data_file}.gpg'
-        # Временный zip
-        with tempfile.TemporaryDirectory() as tmpdir:
-            zip_path = Path(tmpdir) / 'passman_export.zip'
-            with zipfile.ZipFile(zip_path, 'w') as zipf:
-                if settings_path.exists():
-                    zipf.write(settings_path, arcname='settings.gpg')
-                if data_path.exists():
-                    zipf.write(data_path, arcname='passwords.gpg')
-            # Читаем zip
-            with open(zip_path, 'rb') as f:
-                zip_bytes = f.read()
-            # Шифруем zip
-            crypto = CryptoManager(password=self.settings['master_password'], algorithm=self.settings.get('encryption_algorithm', 'AES-256'))
-            encrypted = crypto.encrypt_data({'data': zip_bytes.hex()})
-        # Сохраняем в домашнюю директорию
         now = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
         export_path = Path(self.home_dir) / f'passman_export_{now}.pmz'
-        with open(export_path, 'w') as f:
-            f.write(encrypted)
+        with contextlib.ExitStack() as stack:
+            files = [stack.enter_context(open(path, 'rb')) if path.exists() else io.BytesIO()
+                     for path in (settings_path, data_path)]
+            sizes = []
+            for f in files:
+                sizes.append(f.seek(0, os.SEEK_END))
+                f.seek(0)
+            # Оба файла уже зашифрованы, zip не нужен: длины + содержимое подряд, без копии в памяти
+            frame = _ChainReader([io.BytesIO(self.EXPORT_FRAME.pack(*sizes))] + files)
+            out = stack.enter_context(open(export_path, 'wb'))
+            self._get_crypto().encrypt_stream(frame, out)
         window = BaseWindow(stdscr)
         window.draw_message(f'Экспорт завершён: {export_path}', color_pair=3)
         window.refresh()
-        window.wait_for_key([10, 13, 27])
+        window.wait_for_key(DISMISS_KEYS)
 
     def import_data(self, stdscr):
         """Импорт данных и настроек из зашифрованного архива"""
-        import zipfile
-        import tempfile
-        from .ui.base import BaseWindow
         window = BaseWindow(stdscr)
         window.clear()
         window.draw_header("Импорт данных")
-        window.draw_footer(["[Enter] - Импорт", "[Esc] - Отмена"])
+        window.draw_footer(("[Enter] - Импорт", "[Esc] - Отмена"))
         file_path = window.get_string_input("Путь к архиву: ", 3, 2)
         if not file_path:
             return
         password = window.get_string_input("Мастер-пароль: ", 5, 2, mask=True)
         if not password:
             return
+        # Pending edits must not overwrite imported files later
+        self.flush_data()
+        crypto = None
         try:
-            with open(file_path, 'r') as f:
-                encrypted = f.read()
-            crypto = CryptoManager(password=password, algorithm=self.settings.get('encryption_algorithm', 'AES-256'))
-            data = crypto.decrypt_data(encrypted)
-            zip_bytes = bytes.fromhex(data['data'])
-            with tempfile.TemporaryDirectory() as tmpdir:
-                zip_path = Path(tmpdir) / 'import.zip'
-                with open(zip_path, 'wb') as fzip:
-                    fzip.write(zip_bytes)
-                with zipfile.ZipFile(zip_path, 'r') as zipf:
-                    for name in zipf.namelist():
-                        out_path = self.storage_dir / name
-                        zipf.extract(name, self.storage_dir)
+            # The archive may come from another installation, so its password is asked separately
+            if hmac.compare_digest(password.encode('utf-8'), self._master_password):
+                crypto = self._get_crypto()
+            else:
+                crypto = CryptoManager(password=password)
+            with tempfile.TemporaryFile() as payload:
+                with open(file_path, 'rb') as src:
+                    legacy = src.read(64).lstrip().startswith(CryptoManager.LEGACY_HEADER.encode('ascii'))
+                    src.seek(0)
+                    if legacy:
+                        # Архив старого формата: hex внутри json
+                        payload.write(bytes.fromhex(crypto.decrypt_data(src.read().decode('ascii'))['data']))
+                    else:
+                        # Расшифровка идёт во временный файл, при ошибке тега он просто удаляется
+                        crypto.decrypt_stream(src, payload)
+                payload.seek(0)
+                if payload.read(4) == self.ZIP_MAGIC:
+                    # Архивы прежних версий - zip
+                    import zipfile
+                    with zipfile.ZipFile(payload, 'r') as zipf:
+                        for info in zipf.infolist():
+                            if not info.is_dir():
+                                atomic_write(self.storage_dir / Path(info.filename).name, zipf.read(info))
+                else:
+                    payload.seek(0)
+                    s_len, d_len = self.EXPORT_FRAME.unpack(payload.read(self.EXPORT_FRAME.size))
+                    if payload.seek(0, os.SEEK_END) != self.EXPORT_FRAME.size + s_len + d_len:
+                        raise ValueError("Повреждённый архив")
+                    payload.seek(self.EXPORT_FRAME.size)
+                    s_bytes = payload.read(s_len)
+                    d_bytes = payload.read(d_len)
+                    if s_len:
+                        atomic_write(self.storage_dir / f'{self.settings_file}.gpg', s_bytes)
+                    if d_len:
+                        atomic_write(self.storage_dir / f'{self.data_file}.gpg', d_bytes)
+            # Imported settings may use another master password, the verifier is rebuilt on next login
+            if self.verifier_file.exists():
+                os.remove(self.verifier_file)
             window.draw_message("Импорт завершён! Перезапустите приложение.", color_pair=3)
         except Exception as e:
             window.draw_message(f"Ошибка импорта: {e}", color_pair=4)
+        if crypto is not None and crypto is not self._crypto:
+            # Keys derived for another installation's password are not needed any more
+            crypto.wipe_keys()
         window.refresh()
-        window.wait_for_key([10, 13, 27])
+        window.wait_for_key(DISMISS_KEYS)
 
 
 def main():
     """Application entry point"""
     password_manager = PasswordManager()
-    curses.wrapper(password_manager.run) 
\ No newline at end of file
+    try:
+        curses.wrapper(password_manager.run)
+    finally:
+        password_manager.close() 
\ No newline at end of file
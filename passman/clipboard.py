@@ -1,43 +1,70 @@
-import pyperclip
+import hmac
 import time
 import threading
 
 class ClipboardManager:
     """Manager for clipboard operations"""
-    
+
     def __init__(self):
         """Initialize clipboard manager"""
-        self.timer = None
-    
+        # Monotonic time when the clipboard should be cleared, None - nothing scheduled
+        self._deadline = None
+        # Last text we put on the clipboard, so clearing doesn't clobber the user's own copies
+        self._last_set = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        # One long-lived thread serves all scheduled clears
+        self._thread = threading.Thread(target=self._runner, daemon=True)
+        self._thread.start()
+
     def copy_to_clipboard(self, text, clear_after=30):
         """
         Copies text to clipboard
-        
+
         Args:
             text: Text to copy
             clear_after: Time in seconds to clear clipboard after (0 - never clear)
         """
         try:
+            # Imported on first use, keeps it off the start-up path
+            import pyperclip
             pyperclip.copy(text)
-            
-            # Stop previous timer if it exists
-            if self.timer and self.timer.is_alive():
-                self.timer.cancel()
-            
-            # Start timer to clear if needed
-            if clear_after > 0:
-                self.timer = threading.Timer(clear_after, self.clear_clipboard)
-                self.timer.daemon = True
-                self.timer.start()
-                
+            self._last_set = text
+
+            # Replace previously scheduled clear, if any
+            with self._lock:
+                self._deadline = time.monotonic() + clear_after if clear_after > 0 else None
+            self._wakeup.set()
+
             return True
         except Exception as e:
             return False
-    
+
+    def _runner(self):
+        """Background loop clearing the clipboard when the deadline passes"""
+        while True:
+            with self._lock:
+                deadline = self._deadline
+                expired = deadline is not None and deadline <= time.monotonic()
+                if expired:
+                    self._deadline = None
+            if expired:
+                self.clear_clipboard()
+                continue
+            timeout = None if deadline is None else deadline - time.monotonic()
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+
     def clear_clipboard(self):
-        """Clears clipboard"""
+        """Clears clipboard if it still holds the text we copied"""
         try:
-            pyperclip.copy('')
+            if self._last_set is None:
+                return True
+            import pyperclip
+            current = pyperclip.paste() or ''
+            if hmac.compare_digest(current.encode('utf-8'), self._last_set.encode('utf-8')):
+                pyperclip.copy('')
+            self._last_set = None
             return True
         except Exception as e:
-            return False 
\ No newline at end of file
+            return False
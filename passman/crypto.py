@@ -1,74 +1,503 @@
 import os
 import json
-import gnupg
+import ctypes
+import hmac
 import base64
+import struct
+import hashlib
+import zlib
+import binascii
+import tempfile
 from pathlib import Path
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+from cryptography.hazmat.primitives.poly1305 import Poly1305
 from cryptography.hazmat.backends import default_backend
+from cryptography.exceptions import InvalidTag
+
+try:
+    import orjson
+except ImportError:  # optional, stock json is used instead
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # optional, zlib is used instead
+    zstandard = None
+
+try:
+    from cryptography.hazmat.decrepit.ciphers.algorithms import Camellia
+except ImportError:  # cryptography < 43
+    Camellia = algorithms.Camellia
+
+
+if orjson is not None:
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+else:
+    def _dumps(data):
+        """Compact UTF-8 JSON as bytes"""
+        return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    def _loads(data):
+        """Parse JSON from bytes"""
+        return json.loads(bytes(data))
+
+
+class MissingBackendError(ValueError):
+    """File can only be read with an optional package that is not installed"""
+
+
+def atomic_write(path, text):
+    """Write text (or bytes) to path through a temporary file and os.replace, so a crash never leaves a partial file"""
+    path = Path(path)
+    mode = 'wb' if isinstance(text, (bytes, bytearray)) else 'w'
+    with tempfile.NamedTemporaryFile(mode, dir=path.parent, prefix=f'.{path.name}.', delete=False) as f:
+        try:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, path)
+
+
+# Compression codec identifiers, stored in the high nibble of the blob header byte
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+# Errors raised by the optional decompressor on corrupted input
+DECOMPRESS_ERRORS = zstandard.ZstdError if zstandard is not None else zlib.error
+
+
+def _compressobj():
+    """Streaming compressor for new blobs, returns (codec, compressor)"""
+    if zstandard is not None:
+        return CODEC_ZSTD, zstandard.ZstdCompressor(level=10).compressobj()
+    return CODEC_ZLIB, zlib.compressobj(9)
+
+
+class _Passthrough:
+    """Decompressor for blobs stored without compression"""
+
+    def decompress(self, data):
+        return data
+
+    def flush(self):
+        return b''
+
+
+def _decompressobj(codec):
+    """Streaming decompressor for the given codec"""
+    if codec == CODEC_NONE:
+        return _Passthrough()
+    if codec == CODEC_ZLIB:
+        return zlib.decompressobj()
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise MissingBackendError("File is compressed with zstd, install zstandard to read it.")
+        return zstandard.ZstdDecompressor().decompressobj()
+    raise ValueError("Failed to decrypt data. File is corrupted.")
+
+
+def _compress(data):
+    """Compress plaintext before encryption, returns (codec, payload)"""
+    if zstandard is not None:
+        return CODEC_ZSTD, zstandard.ZstdCompressor(level=10).compress(data)
+    return CODEC_ZLIB, zlib.compress(data, 9)
+
+
+def _decompress(codec, data):
+    """Reverse _compress for the given codec"""
+    decompressor = _decompressobj(codec)
+    return decompressor.decompress(data) + decompressor.flush()
+
+
+def wipe_buffer(buffer):
+    """Overwrite a bytearray in place"""
+    if buffer:
+        ctypes.memset(ctypes.addressof(ctypes.c_char.from_buffer(buffer)), 0, len(buffer))
+
+
+def _chacha20(key, counter, nonce):
+    """ChaCha20 cipher starting at the given block counter"""
+    return Cipher(algorithms.ChaCha20(key, struct.pack('<I', counter) + nonce), mode=None, backend=default_backend())
+
+
+def _camellia_keys(key):
+    """Split the derived key into independent encryption and MAC keys"""
+    enc_key = hmac.new(key, b'passman-enc', hashlib.sha256).digest()
+    mac_key = hmac.new(key, b'passman-mac', hashlib.sha256).digest()
+    return enc_key, mac_key
+
+
+class _AeadStream:
+    """Incremental authenticated encryption or decryption of one message
+
+    AES-256-GCM uses the cipher's own tag, ChaCha20 is authenticated with
+    Poly1305 as in RFC 8439 (empty AAD) and Camellia-256-CBC with a
+    truncated HMAC-SHA256 over nonce and ciphertext.
+    """
+
+    TAG_SIZE = 16
+
+    def __init__(self, alg_id, key, nonce, tag=None):
+        """Encrypts when tag is None, otherwise decrypts and verifies against tag"""
+        self._decrypt = tag is not None
+        self._expected_tag = tag
+        self._mac = None
+        self._padder = None
+        self._length = 0
+        self.tag = None
+        setup, self._finish, self._compute_tag = self._HANDLERS[alg_id]
+        cipher = setup(self, key, nonce)
+        self._context = cipher.decryptor() if self._decrypt else cipher.encryptor()
+
+    def _setup_aes_gcm(self, key, nonce):
+        return Cipher(algorithms.AES(key), modes.GCM(nonce, self._expected_tag), backend=default_backend())
+
+    def _setup_chacha20(self, key, nonce):
+        self._mac = Poly1305(_chacha20(key, 0, nonce).encryptor().update(bytes(32)))
+        return _chacha20(key, 1, nonce)
+
+    def _setup_camellia(self, key, nonce):
+        enc_key, mac_key = _camellia_keys(key)
+        self._mac = hmac.new(mac_key, nonce, hashlib.sha256)
+        pkcs7 = padding.PKCS7(128)
+        self._padder = pkcs7.unpadder() if self._decrypt else pkcs7.padder()
+        return Cipher(Camellia(enc_key), modes.CBC(nonce), backend=default_backend())
+
+    def _run(self, data):
+        """Pass data through the cipher context into one preallocated buffer"""
+        buf = bytearray(len(data) + 15)
+        size = self._context.update_into(data, buf)
+        del buf[size:]
+        return buf
+
+    def _authenticate(self, ciphertext):
+        if self._mac is not None:
+            self._mac.update(ciphertext)
+            self._length += len(ciphertext)
+
+    def update(self, data):
+        """Process the next chunk, returns output available so far"""
+        if self._decrypt:
+            self._authenticate(data)
+            out = self._run(data)
+            return self._padder.update(out) if self._padder else out
+        if self._padder:
+            data = self._padder.update(data)
+        out = self._run(data)
+        self._authenticate(out)
+        return out
+
+    def _tag_poly1305(self):
+        # RFC 8439: ciphertext padded to 16 bytes, then AAD and ciphertext lengths
+        self._mac.update(bytes(-self._length % 16))
+        self._mac.update(struct.pack('<QQ', 0, self._length))
+        return self._mac.finalize()
+
+    def _tag_hmac(self):
+        return self._mac.digest()[:self.TAG_SIZE]
+
+    def _finish_aes_gcm(self):
+        """GCM produces and checks the tag itself"""
+        if self._decrypt:
+            try:
+                return self._context.finalize()
+            except InvalidTag:
+                raise ValueError("Failed to decrypt data. Check your password.")
+        out = self._context.finalize()
+        self.tag = self._context.tag
+        return out
+
+    def _finish_with_mac(self):
+        """Ciphers authenticated by a separate MAC over the ciphertext"""
+        if self._decrypt:
+            if not hmac.compare_digest(self._expected_tag, self._compute_tag(self)):
+                raise ValueError("Failed to decrypt data. Check your password.")
+            out = self._context.finalize()
+            if self._padder:
+                out = self._padder.update(out) + self._padder.finalize()
+            return out
+        out = b''
+        if self._padder:
+            out = self._context.update(self._padder.finalize())
+        out += self._context.finalize()
+        self._authenticate(out)
+        self.tag = self._compute_tag(self)
+        return out
+
+    def finalize(self):
+        """Finish the message; sets tag when encrypting, raises ValueError on a bad tag when decrypting"""
+        return self._finish(self)
+
+    # Algorithm identifier -> (cipher setup, finish, tag), resolved once per message
+    _HANDLERS = {
+        1: (_setup_aes_gcm, _finish_aes_gcm, None),
+        2: (_setup_chacha20, _finish_with_mac, _tag_poly1305),
+        3: (_setup_camellia, _finish_with_mac, _tag_hmac)
+    }
 
 
 class CryptoManager:
     """Data encryption manager"""
-    
+
+    # Algorithm name -> identifier stored in the low nibble of the first byte of every blob
     ALGORITHMS = {
-        'AES-256': 'aes256',
-        'ChaCha20': 'chacha20',
-        'Camellia': 'camellia256'
+        'AES-256': 1,
+        'ChaCha20': 2,
+        'Camellia': 3
     }
-    
+
+    # Nonce size per algorithm identifier
+    NONCE_SIZES = {
+        1: 12,  # AES-256-GCM
+        2: 12,  # ChaCha20-Poly1305 (RFC 8439)
+        3: 16   # Camellia-256-CBC + HMAC-SHA256
+    }
+
+    SALT_SIZE = 16
+    TAG_SIZE = _AeadStream.TAG_SIZE
+    KEY_SIZE = 32
+    CHUNK_SIZE = 64 * 1024
+
+    # Files written by older versions are ASCII-armored OpenPGP messages
+    LEGACY_HEADER = '-----BEGIN PGP MESSAGE-----'
+
     def __init__(self, password, algorithm='AES-256'):
         """Data encryption manager initialization"""
         self.password = password
-        self.algorithm = algorithm
-        
+        self.algorithm = algorithm  # also resolves self._alg_id
+
         # Directory for storing passwords
         home = str(Path.home())
         self.storage_dir = Path(home) / '.passman'
         self.storage_dir.mkdir(exist_ok=True)
-        
-        # GPG initialization
-        self.gpg = gnupg.GPG(gnupghome=str(self.storage_dir))
-        
+
+        # Derived keys by salt, so repeated saves don't re-run the KDF
+        self._keys = {}
+        self._salt = None
+        self._gpg = None
+        # Whether the last decrypt_data call read a GnuPG file, which the next save migrates
+        self.last_was_legacy = False
+
+    @property
+    def algorithm(self):
+        """Algorithm name used for new writes"""
+        return self._algorithm
+
+    @algorithm.setter
+    def algorithm(self, name):
+        self._algorithm = name
+        # Resolve the identifier once instead of on every encryption
+        self._alg_id = self.ALGORITHMS.get(name, 1)
+
+    @classmethod
+    def _scrypt(cls, password, salt):
+        """Derive a 256-bit value from the password with scrypt"""
+        kdf = Scrypt(salt=salt, length=cls.KEY_SIZE, n=2 ** 15, r=8, p=1, backend=default_backend())
+        # Password may be a str or a bytes-like buffer that the caller wipes later
+        return kdf.derive(password.encode('utf-8') if isinstance(password, str) else password)
+
+    def _derive_key(self, salt):
+        """Derive the encryption key for the given salt"""
+        key = self._keys.get(salt)
+        if key is None:
+            # Kept in a bytearray so wipe_keys can zero it
+            key = bytearray(self._scrypt(self.password, salt))
+            self._keys[salt] = key
+        return key
+
+    def wipe_keys(self):
+        """Zero and forget the cached derived keys"""
+        for key in self._keys.values():
+            wipe_buffer(key)
+        self._keys.clear()
+
+    @classmethod
+    def create_verifier(cls, password, salt=None):
+        """Salted hash used to check the master password without decrypting anything"""
+        # Own random salt, so the verifier never equals an encryption key
+        if salt is None:
+            salt = os.urandom(cls.SALT_SIZE)
+        return {'salt': salt.hex(), 'hash': cls._scrypt(password, salt).hex()}
+
+    @classmethod
+    def check_verifier(cls, password, verifier):
+        """Constant-time check of the password against a stored verifier"""
+        try:
+            salt = bytes.fromhex(verifier['salt'])
+            expected = verifier['hash']
+        except (KeyError, TypeError, ValueError):
+            return False
+        return hmac.compare_digest(cls.create_verifier(password, salt)['hash'], expected)
+
+    def _seal(self, alg_id, key, nonce, plaintext):
+        """Encrypt and authenticate plaintext, returns (ciphertext, tag)"""
+        stream = _AeadStream(alg_id, key, nonce)
+        ciphertext = stream.update(plaintext)
+        ciphertext += stream.finalize()
+        return ciphertext, stream.tag
+
+    def _open(self, alg_id, key, nonce, tag, ciphertext):
+        """Verify and decrypt ciphertext"""
+        stream = _AeadStream(alg_id, key, nonce, tag)
+        plaintext = stream.update(ciphertext)
+        plaintext += stream.finalize()
+        return plaintext
+
+    def _new_header(self):
+        """Fresh (alg_id, key, nonce) for a blob written with the current settings"""
+        alg_id = self._alg_id
+        if self._salt is None:
+            self._salt = os.urandom(self.SALT_SIZE)
+        return alg_id, self._derive_key(self._salt), os.urandom(self.NONCE_SIZES[alg_id])
+
+    def _split_header(self, blob):
+        """Parse blob header, returns (codec, alg_id, salt, nonce, tag, header size)"""
+        header = blob[0] if blob else 0
+        alg_id = header & 0x0F
+        nonce_size = self.NONCE_SIZES.get(alg_id)
+        if nonce_size is None or len(blob) < 1 + self.SALT_SIZE + nonce_size + self.TAG_SIZE:
+            raise ValueError("Failed to decrypt data. File is corrupted.")
+
+        pos = 1
+        salt = bytes(blob[pos:pos + self.SALT_SIZE])
+        pos += self.SALT_SIZE
+        nonce = bytes(blob[pos:pos + nonce_size])
+        pos += nonce_size
+        tag = bytes(blob[pos:pos + self.TAG_SIZE])
+        pos += self.TAG_SIZE
+        return header >> 4, alg_id, salt, nonce, tag, pos
+
+    def encrypt_bytes(self, data):
+        """Encrypting raw bytes"""
+        alg_id, key, nonce = self._new_header()
+        codec, payload = _compress(data)
+        ciphertext, tag = self._seal(alg_id, key, nonce, payload)
+        # Layout: codec << 4 | algorithm id || salt || nonce || tag || ciphertext
+        return b''.join((bytes([codec << 4 | alg_id]), self._salt, nonce, tag, ciphertext))
+
+    def decrypt_bytes(self, blob):
+        """Decrypting raw bytes produced by encrypt_bytes"""
+        codec, alg_id, salt, nonce, tag, pos = self._split_header(blob)
+        # Slice the ciphertext without copying it
+        ciphertext = memoryview(blob)[pos:]
+        payload = self._open(alg_id, self._derive_key(salt), nonce, tag, ciphertext)
+        try:
+            plaintext = _decompress(codec, payload)
+        except (zlib.error, DECOMPRESS_ERRORS):
+            raise ValueError("Failed to decrypt data. File is corrupted.")
+        # Reuse the salt (and its cached key) for subsequent saves
+        self._salt = salt
+        return plaintext
+
+    def encrypt_stream(self, src, dst):
+        """Encrypting a binary file object into a seekable one, chunk by chunk"""
+        alg_id, key, nonce = self._new_header()
+        codec, compressor = _compressobj()
+        stream = _AeadStream(alg_id, key, nonce)
+        dst.write(bytes([codec << 4 | alg_id]) + self._salt + nonce)
+        # The tag is only known at the end, reserve its place and fill it in afterwards
+        tag_pos = dst.tell()
+        dst.write(bytes(self.TAG_SIZE))
+        for chunk in iter(lambda: src.read(self.CHUNK_SIZE), b''):
+            dst.write(stream.update(compressor.compress(chunk)))
+        dst.write(stream.update(compressor.flush()))
+        dst.write(stream.finalize())
+        dst.seek(tag_pos)
+        dst.write(stream.tag)
+        dst.seek(0, os.SEEK_END)
+
+    def decrypt_stream(self, src, dst):
+        """Decrypting a file object written by encrypt_stream or encrypt_bytes
+
+        Plaintext is written before the tag is checked at the end, so on
+        ValueError the caller must discard whatever reached dst.
+        """
+        head = src.read(1)
+        nonce_size = self.NONCE_SIZES.get(head[0] & 0x0F if head else 0, 0)
+        head += src.read(self.SALT_SIZE + nonce_size + self.TAG_SIZE)
+        codec, alg_id, salt, nonce, tag, _ = self._split_header(head)
+        decompressor = _decompressobj(codec)
+        stream = _AeadStream(alg_id, self._derive_key(salt), nonce, tag)
+        try:
+            for chunk in iter(lambda: src.read(self.CHUNK_SIZE), b''):
+                dst.write(decompressor.decompress(stream.update(chunk)))
+        except (zlib.error, DECOMPRESS_ERRORS):
+            # A wrong password breaks the decompressor before the tag is reached,
+            # check the tag anyway so the error names the actual cause
+            for chunk in iter(lambda: src.read(self.CHUNK_SIZE), b''):
+                stream.update(chunk)
+            stream.finalize()
+            raise ValueError("Failed to decrypt data. File is corrupted.")
+        tail = stream.finalize()
+        try:
+            # zstd refuses further input once its frame is complete, even an empty one
+            if tail:
+                dst.write(decompressor.decompress(tail))
+            dst.write(decompressor.flush())
+        except (zlib.error, DECOMPRESS_ERRORS):
+            raise ValueError("Failed to decrypt data. File is corrupted.")
+        self._salt = salt
+
     def encrypt_data(self, data):
         """Encrypting data"""
-        json_data = json.dumps(data)
-        encrypted_data = self.gpg.encrypt(
-            json_data, 
-            recipients=None, 
-            symmetric=self.ALGORITHMS.get(self.algorithm, 'aes256'),
-            passphrase=self.password
-        )
-        return str(encrypted_data)
-    
+        plaintext = _dumps(data)
+        return base64.b64encode(self.encrypt_bytes(plaintext)).decode('ascii')
+
     def decrypt_data(self, encrypted_data):
         """Decrypting data"""
-        decrypted_data = self.gpg.decrypt(
-            encrypted_data, 
-            passphrase=self.password
-        )
-        
+        self.last_was_legacy = encrypted_data.lstrip().startswith(self.LEGACY_HEADER)
+        if self.last_was_legacy:
+            return self._decrypt_legacy(encrypted_data)
+
+        try:
+            blob = base64.b64decode(encrypted_data, validate=True)
+        except (binascii.Error, ValueError):
+            raise ValueError("Failed to decrypt data. File is corrupted.")
+
+        return _loads(self.decrypt_bytes(blob))
+
+    @property
+    def gpg(self):
+        """GnuPG handle, only created when a legacy file has to be read"""
+        if self._gpg is None:
+            try:
+                import gnupg
+            except ImportError:
+                raise MissingBackendError("File was written by an older version, install python-gnupg to read it.")
+            self._gpg = gnupg.GPG(gnupghome=str(self.storage_dir))
+        return self._gpg
+
+    def _decrypt_legacy(self, encrypted_data):
+        """Decrypting data written by the GnuPG-based versions"""
+        passphrase = self.password if isinstance(self.password, str) else bytes(self.password).decode('utf-8')
+        decrypted_data = self.gpg.decrypt(encrypted_data, passphrase=passphrase)
+
         if not decrypted_data.ok:
             raise ValueError("Failed to decrypt data. Check your password.")
-        
-        return json.loads(str(decrypted_data))
-    
+
+        return _loads(decrypted_data.data)
+
     def save_to_file(self, data, filename):
         """Saving data to file"""
         encrypted = self.encrypt_data(data)
-        filepath = self.storage_dir / f"{filename}.gpg"
-        
-        with open(filepath, 'w') as f:
-            f.write(encrypted)
-    
+        atomic_write(self.storage_dir / f"{filename}.gpg", encrypted)
+
     def load_from_file(self, filename):
         """Loading data from file"""
         filepath = self.storage_dir / f"{filename}.gpg"
-        
+
         if not filepath.exists():
             return None
-        
+
         with open(filepath, 'r') as f:
             encrypted_data = f.read()
-        
-        return self.decrypt_data(encrypted_data) 
\ No newline at end of file
+
+        return self.decrypt_data(encrypted_data)
@@ -0,0 +1,63 @@
+FIELDS = ('service_name', 'username', 'password', 'note')
+
+
+def empty_columns():
+    """Create empty column storage"""
+    return {field: [] for field in FIELDS}
+
+
+def columns_from_data(data):
+    """Build column storage from loaded data (columns or the older list of entries)"""
+    columns = empty_columns()
+    if isinstance(data, dict):
+        for field in FIELDS:
+            columns[field] = list(data.get(field, []))
+        # Columns saved without a field (e.g. older notes-less files) are padded
+        size = len(columns['service_name'])
+        for field in FIELDS:
+            columns[field] += [''] * (size - len(columns[field]))
+    elif data:
+        EntriesView(columns).extend(data)
+    return columns
+
+
+class EntriesView:
+    """List-like view over column storage, assembling an entry dict on access"""
+
+    def __init__(self, columns):
+        """Initialize view over the given columns"""
+        self._columns = columns
+
+    def column(self, field):
+        """Direct access to a single column"""
+        return self._columns[field]
+
+    def __len__(self):
+        return len(self._columns['service_name'])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return {field: self._columns[field][index] for field in FIELDS}
+
+    def __iter__(self):
+        for values in zip(*(self._columns[field] for field in FIELDS)):
+            yield dict(zip(FIELDS, values))
+
+    def __setitem__(self, index, entry):
+        for field in FIELDS:
+            self._columns[field][index] = entry.get(field, '')
+
+    def __delitem__(self, index):
+        for field in FIELDS:
+            del self._columns[field][index]
+
+    def append(self, entry):
+        """Add entry to the end of every column"""
+        for field in FIELDS:
+            self._columns[field].append(entry.get(field, ''))
+
+    def extend(self, entries):
+        """Add several entries"""
+        for entry in entries:
+            self.append(entry)
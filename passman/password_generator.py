@@ -1,52 +1,67 @@
 import string
 import secrets
+import functools
+
+# Character classes as bytes, indexing them yields code points directly
+_LOWER = string.ascii_lowercase.encode()
+_UPPER = string.ascii_uppercase.encode()
+_DIGITS = string.digits.encode()
+_SPECIAL = b"!@#$%^&*()_+{}[]<>?/~"
+_CLASSES = (_LOWER, _UPPER, _DIGITS, _SPECIAL)
+
+# Character pool for each 4-bit mask of selected classes (bit 0 - lowercase ... bit 3 - special)
+_POOL_BY_MASK = tuple(
+    b"".join(part for bit, part in enumerate(_CLASSES) if mask >> bit & 1)
+    for mask in range(16)
+)
+
+# Shared instance for shuffling, no need to create one per password
+_SYSRAND = secrets.SystemRandom()
+
+
+@functools.lru_cache(maxsize=32)
+def _translation(pool):
+    """Table mapping a random byte to a pool character, and the bytes to reject"""
+    n = len(pool)
+    # Bytes at or above limit would make the modulo biased, they are rejected
+    limit = 256 - 256 % n
+    table = bytes(pool[i % n] for i in range(limit)) + bytes(256 - limit)
+    return table, bytes(range(limit, 256))
+
+
+def _draw(pool, count):
+    """Pick count characters from pool, mapping random bytes in one translate call"""
+    table, reject = _translation(pool)
+    chars = b""
+    while len(chars) < count:
+        chars += secrets.token_bytes(2 * (count - len(chars))).translate(table, reject)
+    return chars[:count]
+
 
 class PasswordGenerator:
     """Password generator"""
     
-    def __init__(self):
-        self.lowercase = string.ascii_lowercase
-        self.uppercase = string.ascii_uppercase
-        self.digits = string.digits
-        self.special_chars = "!@#$%^&*()_+{}[]<>?/~"
-    
-    def generate_password(self, length=16, include_lowercase=True, include_uppercase=True, 
+    def generate_password(self, length=16, include_lowercase=True, include_uppercase=True,
                          include_digits=True, include_special=True):
         """Generate a password with specified parameters"""
         if length < 4 and (include_lowercase + include_uppercase + include_digits + include_special) > length:
             raise ValueError("Password length is too small for the specified requirements")
         
-        if not any([include_lowercase, include_uppercase, include_digits, include_special]):
+        # Selected character types as a bit mask, it also picks the character pool
+        mask = bool(include_lowercase) | bool(include_uppercase) << 1 | bool(include_digits) << 2 | bool(include_special) << 3
+        if not mask:
             raise ValueError("At least one character type must be selected")
         
-        # Form the character pool
-        char_pool = ""
-        if include_lowercase:
-            char_pool += self.lowercase
-        if include_uppercase:
-            char_pool += self.uppercase
-        if include_digits:
-            char_pool += self.digits
-        if include_special:
-            char_pool += self.special_chars
-        
         # Ensure the password contains at least one character from each selected type
-        password = []
-        if include_lowercase:
-            password.append(secrets.choice(self.lowercase))
-        if include_uppercase:
-            password.append(secrets.choice(self.uppercase))
-        if include_digits:
-            password.append(secrets.choice(self.digits))
-        if include_special:
-            password.append(secrets.choice(self.special_chars))
+        password = bytearray()
+        for bit, part in enumerate(_CLASSES):
+            if mask >> bit & 1:
+                password += _draw(part, 1)
         
         # Add remaining random characters
-        for _ in range(length - len(password)):
-            password.append(secrets.choice(char_pool))
+        password += _draw(_POOL_BY_MASK[mask], length - len(password))
         
         # Shuffle the password
-        password_list = list(password)
-        secrets.SystemRandom().shuffle(password_list)
+        _SYSRAND.shuffle(password)
         
-        return ''.join(password_list) 
\ No newline at end of file
+        return password.decode('ascii')
\ No newline at end of file
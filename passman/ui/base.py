@@ -1,10 +1,151 @@
 import curses
-import os
-import pyperclip
+import functools
+import time
+
+# Line editing actions of get_string_input; get_wch returns str for
+# ordinary keys and int for function keys, both spellings map here
+KEY_TO_ACTION = {
+    '\n': 'submit', '\r': 'submit',
+    '\x1b': 'cancel',
+    '\x7f': 'backspace', '\b': 'backspace',
+    curses.KEY_BACKSPACE: 'backspace', 127: 'backspace', 8: 'backspace',
+    curses.KEY_DC: 'delete',
+    curses.KEY_LEFT: 'left',
+    curses.KEY_RIGHT: 'right',
+    curses.KEY_HOME: 'home',
+    curses.KEY_END: 'end',
+    curses.KEY_F2: 'paste',
+}
+
+# Menu navigation keys as returned by getch
+MENU_KEY_TO_ACTION = {
+    curses.KEY_UP: 'up',
+    curses.KEY_DOWN: 'down',
+    10: 'select', 13: 'select',
+    27: 'back',
+    curses.KEY_RESIZE: 'resize',
+}
+
+# Actions that only move the cursor or delete, shared by all line editors
+EDIT_ACTIONS = frozenset(('backspace', 'delete', 'left', 'right', 'home', 'end'))
+
+
+def apply_edit(action, buf, pos):
+    """Apply one of EDIT_ACTIONS to a line buffer (list of characters) in place, returns the new cursor position"""
+    if action == 'backspace':
+        if pos > 0:
+            del buf[pos - 1]
+            return pos - 1
+    elif action == 'delete':
+        if pos < len(buf):
+            del buf[pos]
+    elif action == 'left':
+        if pos > 0:
+            return pos - 1
+    elif action == 'right':
+        if pos < len(buf):
+            return pos + 1
+    elif action == 'home':
+        return 0
+    elif action == 'end':
+        return len(buf)
+    return pos
+
+# Shared run of '*' for hidden values, sliced instead of built per frame
+_STARS = '*' * 256
+
+
+def masked(length):
+    """'*' repeated length times, as shown in place of a hidden value"""
+    global _STARS
+    if length > len(_STARS):
+        _STARS = '*' * (2 * length)
+    return _STARS[:length]
+
+# Enter or Escape, for wait_for_key on message screens
+DISMISS_KEYS = frozenset((10, 13, 27))
+
+# Shortest time between two redraws driven by held arrow keys (60 FPS)
+FRAME_INTERVAL = 1 / 60
+
+# Milliseconds to wait for a following key before redrawing an input field;
+# pasted or typed-ahead text then redraws once instead of per character
+BURST_WAIT_MS = 2
+
+# Seconds a clipboard read is reused; pasting spawns xclip/xsel each time
+CLIP_TTL = 0.5
+# (monotonic time of the read, text); the text is usually a password, so it is
+# only kept while the prompt that pasted it is open
+_NO_CLIP = (float('-inf'), "")
+_clip_cache = _NO_CLIP
+
+
+def get_clipboard():
+    """Clipboard text, reusing a read made less than CLIP_TTL seconds ago"""
+    global _clip_cache
+    now = time.monotonic()
+    ts, text = _clip_cache
+    if now - ts < CLIP_TTL:
+        return text
+    # Imported on first paste, most sessions never use it
+    import pyperclip
+    try:
+        text = pyperclip.paste() or ""
+    except (pyperclip.PyperclipException, OSError):
+        # No clipboard mechanism available
+        text = ""
+    _clip_cache = (now, text)
+    return text
+
+
+def forget_clipboard():
+    """Drop the cached clipboard text"""
+    global _clip_cache
+    _clip_cache = _NO_CLIP
+
+DEFAULT_FOOTER = ("[↑↓] - Navigation", "[Enter] - Select", "[Esc] - Back")
+
+
+@functools.lru_cache(maxsize=64)
+def _header_layout(title, width):
+    """Header title fitted to the width and its x position"""
+    if len(title) > width - 1:
+        title = title[:width - 4] + "..."
+    return title, max(0, (width - len(title)) // 2)
+
+
+@functools.lru_cache(maxsize=64)
+def _footer_layout(commands, width):
+    """Footer text fitted to the width and its x position"""
+    # Drop whole hints from the end rather than cutting one in half,
+    # keeping a running length so the text is joined only once
+    lengths = [len(command) for command in commands]
+    count = len(lengths)
+    total = sum(lengths) + 3 * (count - 1)
+    while total > width - 2 and count > 1:
+        count -= 1
+        total -= lengths[count] + 3
+    # The fit is decided on lengths alone, the text is built once
+    footer_text = " | ".join(commands[:count])
+    if total > width - 2:
+        footer_text = footer_text[:width - 5] + "..."
+    return footer_text, (width - len(footer_text)) // 2
+
+
+@functools.lru_cache(maxsize=256)
+def _fit_item(item_str, max_width):
+    """Menu item truncated and padded to the highlight width"""
+    if len(item_str) > max_width:
+        item_str = item_str[:max_width-3] + "..."
+    return item_str.ljust(max_width)
+
 
 class BaseWindow:
     """Base class for TUI interface windows"""
     
+    # Colours and terminal modes are global to the curses session, set up once
+    _terminal_ready = False
+    
     def __init__(self, stdscr):
         """Initialization of the base window"""
         self.stdscr = stdscr
@@ -23,89 +164,119 @@ class BaseWindow:
         if self.height < self.min_height or self.width < self.min_width:
             raise ValueError(f"Terminal size is too small. Minimum is {self.min_width}x{self.min_height}, current {self.width}x{self.height}")
         
-        # Initialize colors
-        curses.start_color()
-        curses.use_default_colors()
-        curses.init_pair(1, curses.COLOR_WHITE, -1)  # Header
-        curses.init_pair(2, curses.COLOR_BLACK, curses.COLOR_WHITE)  # Highlight
-        curses.init_pair(3, curses.COLOR_GREEN, -1)  # Success
-        curses.init_pair(4, curses.COLOR_RED, -1)  # Error
-        curses.init_pair(5, curses.COLOR_YELLOW, -1)  # Warning
-        curses.init_pair(6, curses.COLOR_CYAN, -1)  # Information
-        curses.init_pair(7, curses.COLOR_BLACK, curses.COLOR_WHITE)  # Footer
+        if not BaseWindow._terminal_ready:
+            # Initialize colors
+            curses.start_color()
+            curses.use_default_colors()
+            curses.init_pair(1, curses.COLOR_WHITE, -1)  # Header
+            curses.init_pair(2, curses.COLOR_BLACK, curses.COLOR_WHITE)  # Highlight
+            curses.init_pair(3, curses.COLOR_GREEN, -1)  # Success
+            curses.init_pair(4, curses.COLOR_RED, -1)  # Error
+            curses.init_pair(5, curses.COLOR_YELLOW, -1)  # Warning
+            curses.init_pair(6, curses.COLOR_CYAN, -1)  # Information
+            curses.init_pair(7, curses.COLOR_BLACK, curses.COLOR_WHITE)  # Footer
+            
+            # Set keyboard mode
+            curses.cbreak()
+            curses.noecho()
+            stdscr.keypad(True)
+            curses.curs_set(0)  # Hide cursor
+            # The cursor is hidden, don't send moves for it after each update;
+            # let the terminal insert/delete lines and characters when that is cheaper
+            stdscr.leaveok(True)
+            stdscr.idlok(True)
+            stdscr.idcok(True)
+            BaseWindow._terminal_ready = True
         
-        # Set keyboard mode
-        curses.cbreak()
-        curses.noecho()
-        stdscr.keypad(True)
-        curses.curs_set(0)  # Hide cursor
+        # Attributes used on every redraw
+        self._header_attr = curses.color_pair(1)
+        self._highlight_attr = curses.color_pair(2)
+        # Rows of render_items per (width, start_x)
+        self._rendered_items = {}
+        # Monotonic time of the last refresh, for the frame rate cap in drain_moves
+        self._last_draw = 0.0
         
-        # Clear screen
-        stdscr.clear()
+        # Clear screen; erase only blanks the buffer, so ncurses' own
+        # front/back comparison sends just the cells that change
+        stdscr.erase()
     
     def draw_header(self, title):
         """Drawing window header"""
+        # Limit string length so it always fits; titles repeat, the layout is memoized
+        title, x = _header_layout(title, self.width)
+        color = self._header_attr
         try:
-            # Limit string length to prevent errors
-            self.stdscr.addstr(0, 0, " " * (self.width - 1), curses.color_pair(1))
-            self.stdscr.addstr(0, (self.width - len(title)) // 2, title[:self.width-1], curses.color_pair(1))
-        except:
-            # If an error occurs, try again with a shorter string
-            try:
-                self.stdscr.addstr(0, 0, " " * (self.width - 2), curses.color_pair(1))
-                if len(title) > self.width - 2:
-                    title = title[:self.width - 5] + "..."
-                self.stdscr.addstr(0, 1, title, curses.color_pair(1))
-            except:
-                pass
+            self.stdscr.hline(0, 0, ord(' ') | color, self.width - 1)
+            self.stdscr.addstr(0, x, title, color)
+        except curses.error:
+            pass
     
     def draw_footer(self, commands=None):
         """Drawing bottom panel with hints"""
-        if commands is None:
-            commands = ["[↑↓] - Navigation", "[Enter] - Select", "[Esc] - Back"]
-        
-        footer_text = " | ".join(commands)
+        # Screens repeat the same few hint sets, so the layout is memoized;
+        # callers pass constant tuples, tuple() only copies an occasional list
+        footer_text, x = _footer_layout(DEFAULT_FOOTER if commands is None else tuple(commands), self.width)
+        addstr = self.stdscr.addstr
+        color = self._header_attr
         try:
-            self.stdscr.addstr(self.height - 1, 0, " " * (self.width - 1), curses.color_pair(1))
-            if len(footer_text) > self.width - 2:
-                footer_text = footer_text[:self.width - 5] + "..."
-            self.stdscr.addstr(self.height - 1, (self.width - len(footer_text)) // 2, footer_text, curses.color_pair(1))
-        except:
-            try:
-                self.stdscr.addstr(self.height - 1, 0, " " * (self.width - 2), curses.color_pair(1))
-                self.stdscr.addstr(self.height - 1, 1, "Menu", curses.color_pair(1))
-            except:
-                pass
+            self.stdscr.hline(self.height - 1, 0, ord(' ') | color, self.width - 1)
+            addstr(self.height - 1, x, footer_text, color)
+        except curses.error:
+            pass
     
     def draw_menu(self, items, selected_index, start_y=2, start_x=2):
         """Drawing menu with highlighted selected item"""
+        # Limit string length; padding also wipes a previous highlight
+        max_width = self.width - start_x - 2
         for i, item in enumerate(items):
-            y = start_y + i
-            if y >= self.height - 1:
+            if start_y + i >= self.height - 1:
                 break
-            
-            item_str = str(item)
-            # Limit string length
+            self.draw_row(start_y + i, _fit_item(str(item), max_width), i == selected_index, start_x)
+    
+    def draw_page(self, items, selected_index, start_y=2, start_x=2):
+        """Drawing a page of menu items in one addstr call, then highlighting the selected row"""
+        max_width = self.width - start_x - 2
+        items = items[:max(0, self.height - 1 - start_y)]
+        # addstr continues each line at column 0, so the indent is part of the text
+        indent = ' ' * start_x
+        page = '\n'.join(indent + _fit_item(str(item), max_width) for item in items)
+        try:
+            self.stdscr.addstr(start_y, 0, page)
+            if 0 <= selected_index < len(items):
+                self.stdscr.chgat(start_y + selected_index, start_x, max_width, self._highlight_attr)
+        except curses.error:
+            # Error handling during drawing
+            pass
+    
+    def render_items(self, items, start_x=2):
+        """Menu rows already truncated and padded for the current width, for a fixed list of items"""
+        key = (self.width, start_x)
+        rows = self._rendered_items.get(key)
+        if rows is None:
             max_width = self.width - start_x - 2
-            if len(item_str) > max_width:
-                item_str = item_str[:max_width-3] + "..."
-                
-            try:
-                if i == selected_index:
-                    self.stdscr.addstr(y, start_x, item_str.ljust(max_width), curses.color_pair(2))
-                else:
-                    self.stdscr.addstr(y, start_x, item_str)
-            except:
-                # Error handling during drawing
-                pass
+            rows = self._rendered_items[key] = [_fit_item(str(item), max_width) for item in items]
+        return rows
+    
+    def draw_row(self, y, row, selected, start_x=2):
+        """Drawing a single prepared menu row, so a selection change repaints two rows only"""
+        if y >= self.height - 1:
+            return
+        try:
+            if selected:
+                self.stdscr.addstr(y, start_x, row, self._highlight_attr)
+            else:
+                self.stdscr.addstr(y, start_x, row)
+        except curses.error:
+            # Error handling during drawing
+            pass
     
     def draw_message(self, message, y=None, x=None, color_pair=0):
         """Drawing message"""
         if y is None:
             y = self.height // 2
         
-        # Limit message length
-        max_width = self.width - 4
+        # Limit message length; at an explicit position it must also end inside the line
+        max_width = self.width - 4 if x is None else min(self.width - 4, self.width - 1 - x)
         if len(message) > max_width:
             message = message[:max_width-3] + "..."
             
@@ -116,108 +287,166 @@ class BaseWindow:
                 
         try:
             self.stdscr.addstr(y, x, message, curses.color_pair(color_pair))
-        except:
+        except curses.error:
             # Error handling during drawing
-            try:
-                self.stdscr.addstr(y, 1, message[:self.width-4], curses.color_pair(color_pair))
-            except:
-                pass
+            pass
     
     def get_string_input(self, prompt, y, x, mask=False, max_length=50, show_footer=True):
-        curses.echo()
+        # Input is rendered by hand below; terminal echo would print every key
+        # a second time and briefly show masked characters in clear text
+        curses.noecho()
         curses.curs_set(1)
+        # The caret must follow the logical cursor while typing
+        self.stdscr.leaveok(False)
         max_length = min(max_length, self.width - x - len(prompt) - 2)
-        result = ""
+        # Edited in place, joined only for display
+        buf = []
         current_pos = 0
         prev_display = None
         prev_cursor = None
         try:
             self.stdscr.addstr(y, x, prompt)
             input_x = x + len(prompt)
-        except:
+        except curses.error:
             try:
                 short_prompt = ">"
                 self.stdscr.addstr(y, x, short_prompt)
                 input_x = x + len(short_prompt)
-            except:
+            except curses.error:
                 return ""
+        # Hints don't change while typing, draw them once
+        if show_footer:
+            self.draw_footer(("[Enter] - Save", "[Esc] - Cancel", "[F2] - Insert from buffer"))
         while True:
-            display = '*' * len(result) if mask else result
+            display = masked(len(buf)) if mask else ''.join(buf)
             # Перерисовываем только если изменился ввод или позиция курсора
-            if display != prev_display or current_pos != prev_cursor:
+            if (display != prev_display or current_pos != prev_cursor) and not self.input_pending(wide=True):
                 try:
-                    self.stdscr.addstr(y, input_x, display + " " * (max_length - len(result)))
+                    if prev_display is None:
+                        # The field is the rest of the line, curses blanks it
+                        self.stdscr.addstr(y, input_x, display)
+                        self.stdscr.clrtoeol()
+                    elif display != prev_display:
+                        # Rewrite only from the first changed cell, blanking what got shorter
+                        diff = next((i for i, (a, b) in enumerate(zip(prev_display, display)) if a != b),
+                                    min(len(prev_display), len(display)))
+                        self.stdscr.addstr(y, input_x + diff, display[diff:])
+                        if len(display) < len(prev_display):
+                            self.stdscr.clrtoeol()
                     self.stdscr.move(y, input_x + current_pos)
-                    if show_footer:
-                        self.draw_footer(["[Enter] - Save", "[Esc] - Cancel", "[F2] - Insert from buffer"])
-                except:
+                except curses.error:
                     pass
                 prev_display = display
                 prev_cursor = current_pos
             key = self.stdscr.get_wch()  # Use get_wch for Unicode support
-            if isinstance(key, str):
-                if key == '\n' or key == '\r':
-                    break
-                elif key == '\x1b':  # Escape
-                    result = ""
-                    break
-                elif key == '\x7f':  # Backspace
-                    if current_pos > 0:
-                        result = result[:current_pos-1] + result[current_pos:]
-                        current_pos -= 1
-                elif key == '\b':
-                    if current_pos > 0:
-                        result = result[:current_pos-1] + result[current_pos:]
-                        current_pos -= 1
-                elif len(result) < max_length and key.isprintable():
-                    result = result[:current_pos] + key + result[current_pos:]
-                    current_pos += 1
-            elif isinstance(key, int):
-                if key == curses.KEY_BACKSPACE or key == 127 or key == 8:
-                    if current_pos > 0:
-                        result = result[:current_pos-1] + result[current_pos:]
-                        current_pos -= 1
-                elif key == curses.KEY_DC:
-                    if current_pos < len(result):
-                        result = result[:current_pos] + result[current_pos+1:]
-                elif key == curses.KEY_LEFT and current_pos > 0:
-                    current_pos -= 1
-                elif key == curses.KEY_RIGHT and current_pos < len(result):
+            action = KEY_TO_ACTION.get(key)
+            if action is None:
+                if isinstance(key, str) and len(buf) < max_length and key.isprintable():
+                    buf.insert(current_pos, key)
                     current_pos += 1
-                elif key == curses.KEY_HOME:
-                    current_pos = 0
-                elif key == curses.KEY_END:
-                    current_pos = len(result)
-                elif key == curses.KEY_F2:
-                    try:
-                        clip = pyperclip.paste()
-                        if clip:
-                            insert = clip[:max_length-len(result)]
-                            result = result[:current_pos] + insert + result[current_pos:]
-                            current_pos += len(insert)
-                    except Exception:
-                        pass
+            elif action == 'submit':
+                break
+            elif action == 'cancel':
+                buf.clear()
+                break
+            elif action in EDIT_ACTIONS:
+                current_pos = apply_edit(action, buf, current_pos)
+            elif action == 'paste':
+                clip = get_clipboard()
+                if clip:
+                    insert = clip[:max_length-len(buf)]
+                    buf[current_pos:current_pos] = insert
+                    current_pos += len(insert)
         curses.noecho()
         curses.curs_set(0)
-        return result
+        self.stdscr.leaveok(True)
+        forget_clipboard()
+        return ''.join(buf)
     
     def wait_for_key(self, allowed_keys=None):
         """Waiting for key press"""
+        if allowed_keys is not None:
+            allowed_keys = frozenset(allowed_keys)
         while True:
             key = self.stdscr.getch()
             if allowed_keys is None or key in allowed_keys:
                 return key
     
+    def input_pending(self, wide=False):
+        """Whether another key arrives within BURST_WAIT_MS; it is left in the queue for the caller"""
+        self.stdscr.timeout(BURST_WAIT_MS)
+        try:
+            key = self.stdscr.get_wch() if wide else self.stdscr.getch()
+        except curses.error:
+            # get_wch raises instead of returning -1 when nothing arrived
+            key = -1
+        finally:
+            self.stdscr.timeout(-1)
+        if key == -1:
+            return False
+        if isinstance(key, str):
+            curses.unget_wch(key)
+        else:
+            curses.ungetch(key)
+        return True
+    
+    def drain_moves(self, index, count, limit=16):
+        """Apply up/down keys already queued to a selection in range(count), so a held key redraws once"""
+        try:
+            for _ in range(limit):
+                # Keys arriving before the next frame is due join this redraw
+                wait = FRAME_INTERVAL - (time.monotonic() - self._last_draw)
+                self.stdscr.timeout(max(0, int(wait * 1000)))
+                key = self.stdscr.getch()
+                action = MENU_KEY_TO_ACTION.get(key)
+                if action == 'up':
+                    index = max(0, index - 1)
+                elif action == 'down':
+                    index = min(count - 1, index + 1)
+                else:
+                    # Any other key is left for the caller's loop
+                    if key != -1:
+                        curses.ungetch(key)
+                    break
+        finally:
+            self.stdscr.timeout(-1)
+        return index
+    
     def refresh(self):
-        """Screen update"""
-        self.stdscr.refresh()
+        """Screen update, staged and flushed to the terminal in one write"""
+        self.stdscr.noutrefresh()
+        curses.doupdate()
+        self._last_draw = time.monotonic()
     
     def clear(self):
-        """Clearing screen"""
+        """Clearing screen before a redraw, only the changed cells reach the terminal"""
+        self.stdscr.erase()
+    
+    def full_clear(self):
+        """Clearing screen and repainting the terminal from scratch on next refresh"""
         self.stdscr.clear()
     
-    def resize(self):
-        """Updating window size when terminal size changes"""
+    def reset(self):
+        """Prepare a reused window for the next display"""
+        # The terminal may have been resized while another window was shown
         self.height, self.width = self.stdscr.getmaxyx()
-        self.clear()
-        self.refresh() 
\ No newline at end of file
+    
+    def resize(self):
+        """Updating window size when terminal size changes, returns whether it did change"""
+        size = self.stdscr.getmaxyx()
+        # Terminals and multiplexers also send KEY_RESIZE without a size change
+        if size == (self.height, self.width):
+            return False
+        old_height, old_width = self.height, self.width
+        self.height, self.width = size
+        if self.width != old_width:
+            self._rendered_items.clear()
+            # The terminal rewraps every line, the caller's refresh repaints it all
+            self.full_clear()
+        else:
+            # Only the height changed: rows above the old footer stay where they
+            # were, just the old footer line and the rows below it are repainted
+            self.clear()
+            top = min(old_height, self.height) - 1
+            self.stdscr.redrawln(top, self.height - top)
+        return True
@@ -15,40 +15,64 @@ class MainMenu(BaseWindow):
             "Exit"
         ]
         self.selected_index = 0
+        # Key code -> handler, one dict probe per keystroke
+        self._key_handlers = {
+            curses.KEY_UP: self._on_up,
+            curses.KEY_DOWN: self._on_down,
+            10: self._on_select,
+            13: self._on_select,
+            27: self._on_back,
+            curses.KEY_RESIZE: self._on_resize,
+        }
     
     def display(self):
         """Display the main menu (optimized redraw)"""
         prev_selected = -1
         prev_size = (self.height, self.width)
-        dirty = True
+        self._dirty = True
         while True:
-            # Перерисовываем только если изменился выбор или размер окна
-            if dirty or self.selected_index != prev_selected or (self.height, self.width) != prev_size:
+            # Полная перерисовка только при первом показе или изменении размера
+            if self._dirty or (self.height, self.width) != prev_size:
                 self.clear()
                 self.draw_header("Password manager")
                 self.draw_footer()
-                self.draw_menu(self.menu_items, self.selected_index)
+                rows = self.render_items(self.menu_items)
+                for i, row in enumerate(rows):
+                    self.draw_row(2 + i, row, i == self.selected_index)
                 self.refresh()
                 prev_selected = self.selected_index
                 prev_size = (self.height, self.width)
-                dirty = False
-            # Input processing
-            key = self.stdscr.getch()
-            # Navigation
-            if key == curses.KEY_UP and self.selected_index > 0:
-                self.selected_index -= 1
-            elif key == curses.KEY_DOWN and self.selected_index < len(self.menu_items) - 1:
-                self.selected_index += 1
-            # Select item
-            elif key == 10 or key == 13:  # Enter
-                return self.selected_index
-            # Exit
-            elif key == 27:  # Escape
-                return len(self.menu_items) - 1  # Return index of "Exit" item
-            # Handle terminal size change
-            elif key == curses.KEY_RESIZE:
-                self.resize()
-                dirty = True
-            # Если изменился выбор — пометить как dirty
-            if self.selected_index != prev_selected or dirty:
-                continue 
\ No newline at end of file
+                self._dirty = False
+            elif self.selected_index != prev_selected:
+                # Смена выбора затрагивает только две строки
+                self.draw_row(2 + prev_selected, rows[prev_selected], False)
+                self.draw_row(2 + self.selected_index, rows[self.selected_index], True)
+                self.refresh()
+                prev_selected = self.selected_index
+            # Input processing: a handler returns the chosen index to leave the menu
+            handler = self._key_handlers.get(self.stdscr.getch())
+            if handler is not None:
+                choice = handler()
+                if choice is not None:
+                    return choice
+    
+    def _move(self, step):
+        """Move the selection, together with arrow keys already queued"""
+        index = max(0, min(self.selected_index + step, len(self.menu_items) - 1))
+        self.selected_index = self.drain_moves(index, len(self.menu_items))
+    
+    def _on_up(self):
+        self._move(-1)
+    
+    def _on_down(self):
+        self._move(1)
+    
+    def _on_select(self):
+        return self.selected_index
+    
+    def _on_back(self):
+        return len(self.menu_items) - 1  # Index of "Exit" item
+    
+    def _on_resize(self):
+        if self.resize():
+            self._dirty = True
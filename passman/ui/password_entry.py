@@ -1,21 +1,53 @@
 import curses
-from .base import BaseWindow
-from ..password_generator import PasswordGenerator
+from .base import BaseWindow, DISMISS_KEYS, KEY_TO_ACTION, EDIT_ACTIONS, apply_edit, masked, _fit_item
 import re
 
+# Key sets tested in the input loops
+ENTER_KEYS = frozenset((10, 13))
+TOGGLE_KEYS = frozenset((ord('v'), ord('V')))
+GENERATE_KEYS = frozenset((ord('g'), ord('G')))
+# Printable ASCII accepted by the hand-rolled editors
+PRINTABLE_KEYS = frozenset(range(32, 127))
+
+# Words of a note, which is limited to 50 of them
+WORD_RE = re.compile(r'\S+')
+
+
+def _word_change(buf, i):
+    """Words the character buf[i] adds to the buffer compared with it removed"""
+    left = i > 0 and not buf[i-1].isspace()
+    right = i + 1 < len(buf) and not buf[i+1].isspace()
+    if buf[i].isspace():
+        return 1 if left and right else 0  # Splits a word in two
+    return 0 if left or right else 1  # A word of its own
+
+# Edit menu labels -> entry fields
+FIELD_MAP = {
+    "Service name": "service_name",
+    "Username": "username",
+    "Password": "password",
+    "Note": "note"
+}
+
+# Edit window hints, the password field also offers generation
+EDIT_FOOTER = ("[Enter] - Edit", "[Esc] - Cancel")
+EDIT_PASSWORD_FOOTER = ("[Enter] - Edit", "[G] - Generate", "[Esc] - Cancel")
+# First row of the field menu in the edit window
+EDIT_MENU_Y = 9
+
 class AddEntryWindow(BaseWindow):
     """Add new record window with password"""
     
-    def __init__(self, stdscr):
+    def __init__(self, stdscr, password_generator):
         """Initialize add record window"""
         super().__init__(stdscr)
-        self.password_generator = PasswordGenerator()
+        self.password_generator = password_generator
     
     def display(self):
         """Display add record window"""
         self.clear()
         self.draw_header("Add new record")
-        self.draw_footer(["[Enter] - Save", "[G] - Generate password", "[Esc] - Cancel"])
+        self.draw_footer(("[Enter] - Save", "[G] - Generate password", "[Esc] - Cancel"))
         
         # Ask for service name
         service_name = self.get_string_input("Service name: ", 3, 2)
@@ -28,36 +60,58 @@ class AddEntryWindow(BaseWindow):
             return None
             
         # Ask for password with masking
-        password = ""
+        # Only printable ASCII is accepted, kept as bytes and decoded once on Enter
+        password = bytearray()
+        prompt = "Password: "
+        mask_x = 2 + len(prompt)
+        # Length of the mask on screen, None when the whole line has to be drawn
+        shown = None
         while True:
-            self.stdscr.move(7, 2)
-            self.stdscr.clrtoeol()
-            self.stdscr.addstr(7, 2, "Password: " + "*" * len(password))
-            self.refresh()
+            # Keys arriving back to back (paste, typing ahead) are taken before redrawing
+            if shown != len(password) and not self.input_pending():
+                try:
+                    if shown is None:
+                        self.stdscr.move(7, 2)
+                        self.stdscr.clrtoeol()
+                        self.stdscr.addstr(7, 2, prompt + masked(len(password)))
+                    elif len(password) > shown:
+                        # Typing adds cells at the end, backspace removes them
+                        self.stdscr.addstr(7, mask_x + shown, masked(len(password) - shown))
+                    else:
+                        self.stdscr.move(7, mask_x + len(password))
+                        self.stdscr.clrtoeol()
+                except curses.error:
+                    pass
+                shown = len(password)
+                self.refresh()
             
             key = self.stdscr.getch()
-            if key == ord('g') or key == ord('G'):
-                password = self.password_generator.generate_password()
+            if key in GENERATE_KEYS:
+                password = bytearray(self.password_generator.generate_password().encode('ascii'))
+                shown = None
                 continue
-            elif key in [10, 13]:  # Enter
+            elif key in ENTER_KEYS:  # Enter
                 if password:
                     break
             elif key == 27:  # Escape
                 return None
-            elif key == curses.KEY_BACKSPACE or key == 127:
-                password = password[:-1]
-            elif 32 <= key <= 126:  # Printable characters
-                password += chr(key)
+            elif KEY_TO_ACTION.get(key) == 'backspace':
+                if password:
+                    del password[-1]
+            elif key in PRINTABLE_KEYS:
+                password.append(key)
 
         # Ask for note (до 50 слов)
         note = self.get_string_input("Note (up to 50 words): ", 9, 2, max_length=1000)
-        if note and len(re.findall(r'\S+', note)) > 50:
-            note = ' '.join(re.findall(r'\S+', note)[:50])
+        if note:
+            words = WORD_RE.findall(note)
+            if len(words) > 50:
+                note = ' '.join(words[:50])
         
         return {
             "service_name": service_name,
             "username": username,
-            "password": password,
+            "password": password.decode('ascii'),
             "note": note or ""
         }
 
@@ -72,57 +126,87 @@ class ViewEntriesWindow(BaseWindow):
         self.selected_index = 0
         self.offset = 0
         self.items_per_page = self.height - 4  # Consider header and hints
+        # "service (username)" rows, kept between displays until invalidate()
+        self._display_items = None
+    
+    def invalidate(self):
+        """Drop the formatted rows after records were added, edited or deleted"""
+        self._display_items = None
+    
+    def reset(self):
+        """Prepare for the next display, keeping the selection within the records"""
+        super().reset()
+        self.items_per_page = self.height - 4
+        self.selected_index = max(0, min(self.selected_index, len(self.entries) - 1))
+        self.offset = max(0, min(self.offset, self.selected_index, len(self.entries) - self.items_per_page))
+        if self.selected_index >= self.offset + self.items_per_page:
+            self.offset = self.selected_index - self.items_per_page + 1
     
     def display(self):
         """Display view records window (optimized redraw)"""
+        if not self.entries:
+            # Nothing to navigate, a single frame until Enter or Escape
+            self.clear()
+            self.draw_header("Records list")
+            self.draw_footer(("[↑↓] - Navigation", "[Enter] - Select", "[Esc] - Back"))
+            self.draw_message("Records list is empty", self.height // 2, None, 5)
+            self.refresh()
+            self.wait_for_key(DISMISS_KEYS)
+            return None
         prev_selected = -1
         prev_offset = -1
         prev_size = (self.height, self.width)
         dirty = True
+        # Records don't change while the list is shown, they are formatted once
+        if self._display_items is None:
+            self._display_items = [f"{service} ({username})" for service, username in zip(self.entries.column('service_name'), self.entries.column('username'))]
+        display_items = self._display_items
         while True:
-            if dirty or self.selected_index != prev_selected or self.offset != prev_offset or (self.height, self.width) != prev_size:
+            if dirty or (self.height, self.width) != prev_size:
                 self.clear()
                 self.draw_header("Records list")
-                self.draw_footer(["[↑↓] - Navigation", "[Enter] - Select", "[Esc] - Back"])
-                if not self.entries:
-                    self.draw_message("Records list is empty", self.height // 2, None, 5)
-                    self.refresh()
-                    key = self.wait_for_key([10, 13, 27])  # Enter or Escape
-                    return None
-                display_items = [f"{entry['service_name']} ({entry['username']})" for entry in self.entries]
+                self.draw_footer(("[↑↓] - Navigation", "[Enter] - Select", "[Esc] - Back"))
+                prev_offset = -1
+                prev_size = (self.height, self.width)
+                dirty = False
+            if self.offset != prev_offset:
+                # The page scrolled: rewrite the list, padded rows cover the old one
                 visible_items = display_items[self.offset:self.offset+self.items_per_page]
-                self.draw_menu(visible_items, self.selected_index - self.offset)
+                self.draw_page(visible_items, self.selected_index - self.offset)
                 self.refresh()
                 prev_selected = self.selected_index
                 prev_offset = self.offset
-                prev_size = (self.height, self.width)
-                dirty = False
+            elif self.selected_index != prev_selected:
+                # Смена выбора на той же странице затрагивает только две строки
+                max_width = self.width - 4
+                self.draw_row(2 + prev_selected - self.offset, _fit_item(display_items[prev_selected], max_width), False)
+                self.draw_row(2 + self.selected_index - self.offset, _fit_item(display_items[self.selected_index], max_width), True)
+                self.refresh()
+                prev_selected = self.selected_index
             key = self.stdscr.getch()
-            if key == curses.KEY_UP:
-                if self.selected_index > 0:
-                    self.selected_index -= 1
-                    if self.selected_index < self.offset:
-                        self.offset = self.selected_index
-            elif key == curses.KEY_DOWN:
-                if self.selected_index < len(self.entries) - 1:
-                    self.selected_index += 1
-                    if self.selected_index >= self.offset + self.items_per_page:
-                        self.offset += 1
-            elif key == 10 or key == 13:  # Enter
+            if key == curses.KEY_UP or key == curses.KEY_DOWN:
+                # Arrow keys already queued are applied too, a held key redraws once
+                step = -1 if key == curses.KEY_UP else 1
+                index = max(0, min(self.selected_index + step, len(self.entries) - 1))
+                self.selected_index = index = self.drain_moves(index, len(self.entries))
+                # Scroll so the selection stays on the page
+                self.offset = min(max(self.offset, index - self.items_per_page + 1), index)
+            elif key in ENTER_KEYS:  # Enter
                 return self.selected_index
             elif key == 27:  # Escape
                 return None
             elif key == curses.KEY_RESIZE:
-                self.resize()
-                self.items_per_page = self.height - 4
-                dirty = True
-            if self.selected_index != prev_selected or self.offset != prev_offset or dirty:
-                continue
+                if self.resize():
+                    self.items_per_page = self.height - 4
+                    dirty = True
 
 
 class EntryDetailsWindow(BaseWindow):
     """View record details window"""
     
+    # Copy hotkeys in either case -> menu item index
+    HOTKEYS = {ord(c): index for index, letters in enumerate(("lL", "pP", "nN")) for c in letters}
+    
     def __init__(self, stdscr, entry):
         """Initialize record details window"""
         super().__init__(stdscr)
@@ -137,69 +221,119 @@ class EntryDetailsWindow(BaseWindow):
         ]
         self.selected_index = 0
         self.show_hidden = False
+        # Key code -> handler, a handler returns the chosen index to leave the window
+        self._key_handlers = {
+            curses.KEY_UP: self._on_up,
+            curses.KEY_DOWN: self._on_down,
+            10: self._on_select,
+            13: self._on_select,
+            27: self._on_back,
+            curses.KEY_RESIZE: self._on_resize,
+        }
+        for key in TOGGLE_KEYS:
+            self._key_handlers[key] = self._on_toggle
+        for key, index in self.HOTKEYS.items():
+            self._key_handlers[key] = lambda index=index: index
     
     def display(self):
         """Display record details window (optimized redraw)"""
         prev_selected = -1
         prev_show_hidden = None
         prev_size = (self.height, self.width)
-        dirty = True
+        self._dirty = True
         while True:
-            if dirty or self.selected_index != prev_selected or self.show_hidden != prev_show_hidden or (self.height, self.width) != prev_size:
+            # Полная перерисовка при первом показе или изменении размера
+            if self._dirty or (self.height, self.width) != prev_size:
+                entry = self.entry
+                service, note = entry['service_name'], entry.get('note')
+                addstr = self.stdscr.addstr
                 self.clear()
-                self.draw_header(f"Details: {self.entry['service_name']}")
-                self.draw_footer(["[V] - Show/hide"])
-                self.stdscr.addstr(2, 2, f"Service: {self.entry['service_name']}")
-                self.stdscr.addstr(3, 2, f"Username: {self.entry['username']}")
-                if self.show_hidden:
-                    self.stdscr.addstr(4, 2, f"Password: {self.entry['password']}")
-                else:
-                    self.stdscr.addstr(4, 2, f"Password: {'*' * len(self.entry['password'])}")
-                if self.entry.get('note'):
-                    self.stdscr.addstr(5, 2, "Note:")
-                    note_display = self.entry['note'] if self.show_hidden else '*' * min(len(self.entry['note']), 30)
-                    note_lines = note_display.split('\n')
-                    for i, line in enumerate(note_lines[:3]):
-                        self.stdscr.addstr(6 + i, 4, line[:self.width-6])
-                menu_start_y = 10 if self.entry.get('note') else 6
-                self.draw_menu(self.menu_items, self.selected_index, start_y=menu_start_y)
+                self.draw_header(f"Details: {service}")
+                self.draw_footer(("[V] - Show/hide",))
+                addstr(2, 2, f"Service: {service}")
+                addstr(3, 2, f"Username: {entry['username']}")
+                if note:
+                    addstr(5, 2, "Note:")
+                self.draw_secrets()
+                menu_start_y = 10 if note else 6
+                rows = self.render_items(self.menu_items)
+                for i, row in enumerate(rows):
+                    self.draw_row(menu_start_y + i, row, i == self.selected_index)
                 self.refresh()
                 prev_selected = self.selected_index
                 prev_show_hidden = self.show_hidden
                 prev_size = (self.height, self.width)
-                dirty = False
-            key = self.stdscr.getch()
-            if key == curses.KEY_UP and self.selected_index > 0:
-                self.selected_index -= 1
-            elif key == curses.KEY_DOWN and self.selected_index < len(self.menu_items) - 1:
-                self.selected_index += 1
-            elif key == 10 or key == 13:  # Enter
-                return self.selected_index
-            elif key == 27:  # Escape
-                return len(self.menu_items) - 1  # Return selected item index
-            elif key in [ord('l'), ord('L')]:
-                return 0
-            elif key in [ord('p'), ord('P')]:
-                return 1
-            elif key in [ord('n'), ord('N')]:
-                return 2
-            elif key in [ord('v'), ord('V')]:
-                self.show_hidden = not self.show_hidden
-            elif key == curses.KEY_RESIZE:
-                self.resize()
-                dirty = True
-            if self.selected_index != prev_selected or self.show_hidden != prev_show_hidden or dirty:
-                continue
+                self._dirty = False
+            elif self.show_hidden != prev_show_hidden:
+                # Show/hide changes only the password and note lines
+                self.draw_secrets()
+                self.refresh()
+                prev_show_hidden = self.show_hidden
+            elif self.selected_index != prev_selected:
+                # Смена выбора затрагивает только две строки меню
+                self.draw_row(menu_start_y + prev_selected, rows[prev_selected], False)
+                self.draw_row(menu_start_y + self.selected_index, rows[self.selected_index], True)
+                self.refresh()
+                prev_selected = self.selected_index
+            # Input processing: a handler returns the chosen index to leave the window
+            handler = self._key_handlers.get(self.stdscr.getch())
+            if handler is not None:
+                choice = handler()
+                if choice is not None:
+                    return choice
+    
+    def draw_secrets(self):
+        """Drawing the password and note lines, hidden or in clear text"""
+        password, note = self.entry['password'], self.entry.get('note')
+        stdscr = self.stdscr
+        stdscr.move(4, 2)
+        stdscr.clrtoeol()
+        if self.show_hidden:
+            stdscr.addstr(4, 2, f"Password: {password}")
+        else:
+            stdscr.addstr(4, 2, f"Password: {masked(len(password))}")
+        if note:
+            note_display = note if self.show_hidden else masked(min(len(note), 30))
+            note_lines = note_display.split('\n')
+            for i in range(3):
+                stdscr.move(6 + i, 4)
+                stdscr.clrtoeol()
+                if i < len(note_lines):
+                    stdscr.addstr(6 + i, 4, note_lines[i][:self.width-6])
+    
+    def _move(self, step):
+        """Move the selection, together with arrow keys already queued"""
+        index = max(0, min(self.selected_index + step, len(self.menu_items) - 1))
+        self.selected_index = self.drain_moves(index, len(self.menu_items))
+    
+    def _on_up(self):
+        self._move(-1)
+    
+    def _on_down(self):
+        self._move(1)
+    
+    def _on_select(self):
+        return self.selected_index
+    
+    def _on_back(self):
+        return len(self.menu_items) - 1  # Index of "Back" item
+    
+    def _on_toggle(self):
+        self.show_hidden = not self.show_hidden
+    
+    def _on_resize(self):
+        if self.resize():
+            self._dirty = True
 
 
 class EditEntryWindow(BaseWindow):
     """Edit record window"""
     
-    def __init__(self, stdscr, entry):
+    def __init__(self, stdscr, entry, password_generator):
         """Initialize edit record window"""
         super().__init__(stdscr)
         self.entry = entry.copy()  # Create copy of record
-        self.password_generator = PasswordGenerator()
+        self.password_generator = password_generator
         self.fields = [
             "Service name",
             "Username",
@@ -209,6 +343,24 @@ class EditEntryWindow(BaseWindow):
             "Cancel"
         ]
         self.selected_index = 0
+        # "Current values" lines, rebuilt only after the record changes
+        self._summary = None
+        
+    def summary(self):
+        """Lines describing the record being edited"""
+        if self._summary is None:
+            note = self.entry.get('note')
+            if note:
+                note_preview = note[:30] + '...' if len(note) > 30 else note
+            else:
+                note_preview = "<empty>"
+            self._summary = (
+                f"Service: {self.entry['service_name']}",
+                f"Username: {self.entry['username']}",
+                f"Password: {masked(len(self.entry['password']))}",
+                f"Note: {note_preview}",
+            )
+        return self._summary
         
     def display(self):
         """Display edit record window (optimized redraw)"""
@@ -216,189 +368,189 @@ class EditEntryWindow(BaseWindow):
         prev_size = (self.height, self.width)
         dirty = True
         while True:
-            if dirty or self.selected_index != prev_selected or (self.height, self.width) != prev_size:
+            # Полная перерисовка только при первом показе, после правки или изменении размера
+            if dirty or (self.height, self.width) != prev_size:
                 self.clear()
                 self.draw_header("Edit record")
                 self.stdscr.addstr(2, 2, "Current values:")
-                self.stdscr.addstr(3, 4, f"Service: {self.entry['service_name']}")
-                self.stdscr.addstr(4, 4, f"Username: {self.entry['username']}")
-                self.stdscr.addstr(5, 4, f"Password: {'*' * len(self.entry['password'])}")
-                if self.entry.get('note'):
-                    note_preview = self.entry['note'][:30] + '...' if len(self.entry['note']) > 30 else self.entry['note']
-                    self.stdscr.addstr(6, 4, f"Note: {note_preview}")
-                else:
-                    self.stdscr.addstr(6, 4, "Note: <empty>")
+                for i, line in enumerate(self.summary()):
+                    self.stdscr.addstr(3 + i, 4, line)
                 self.stdscr.addstr(8, 2, "Select field to edit:")
-                self.draw_menu(self.fields, self.selected_index, start_y=9)
-                if self.selected_index == 2:  # Password field index
-                    self.draw_footer(["[Enter] - Edit", "[G] - Generate", "[Esc] - Cancel"])
-                else:
-                    self.draw_footer(["[Enter] - Edit", "[Esc] - Cancel"])
+                rows = self.render_items(self.fields)
+                for i, row in enumerate(rows):
+                    self.draw_row(EDIT_MENU_Y + i, row, i == self.selected_index)
+                self.draw_footer(EDIT_PASSWORD_FOOTER if self.selected_index == 2 else EDIT_FOOTER)
                 self.refresh()
                 prev_selected = self.selected_index
                 prev_size = (self.height, self.width)
                 dirty = False
+            elif self.selected_index != prev_selected:
+                # Смена выбора затрагивает только две строки меню
+                self.draw_row(EDIT_MENU_Y + prev_selected, rows[prev_selected], False)
+                self.draw_row(EDIT_MENU_Y + self.selected_index, rows[self.selected_index], True)
+                # The generate hint is shown only on the password field
+                if (prev_selected == 2) != (self.selected_index == 2):
+                    self.draw_footer(EDIT_PASSWORD_FOOTER if self.selected_index == 2 else EDIT_FOOTER)
+                self.refresh()
+                prev_selected = self.selected_index
             key = self.stdscr.getch()
-            if key == curses.KEY_UP and self.selected_index > 0:
-                self.selected_index -= 1
-            elif key == curses.KEY_DOWN and self.selected_index < len(self.fields) - 1:
-                self.selected_index += 1
+            if key == curses.KEY_UP or key == curses.KEY_DOWN:
+                step = -1 if key == curses.KEY_UP else 1
+                index = max(0, min(self.selected_index + step, len(self.fields) - 1))
+                self.selected_index = self.drain_moves(index, len(self.fields))
             elif key == 27:  # Escape
                 return None
-            elif key == 10 or key == 13:  # Enter
+            elif key in ENTER_KEYS:  # Enter
                 if self.selected_index == 4:  # Save
                     return self.entry
                 elif self.selected_index == 5:  # Cancel
                     return None
                 else:
                     self.edit_field(self.selected_index)
+                    self._summary = None
                     dirty = True
-            elif (key in [ord('g'), ord('G')]) and self.selected_index == 2:  # Password generation
+            elif key in GENERATE_KEYS and self.selected_index == 2:  # Password generation
                 self.entry['password'] = self.password_generator.generate_password()
+                self._summary = None
                 dirty = True
             elif key == curses.KEY_RESIZE:
-                self.resize()
-                dirty = True
-            if self.selected_index != prev_selected or (self.height, self.width) != prev_size or dirty:
-                continue
+                if self.resize():
+                    dirty = True
 
     def edit_field(self, field_index):
         """Edit selected field"""
         field_name = self.fields[field_index]
-        field_map = {
-            "Service name": "service_name",
-            "Username": "username",
-            "Password": "password",
-            "Note": "note"
-        }
-        
-        current_value = self.entry[field_map[field_name]]
+        current_value = self.entry[FIELD_MAP[field_name]]
         
-        # Clear input area
-        for i in range(12, 15):
-            self.stdscr.move(i, 2)
-            self.stdscr.clrtoeol()
+        # Clear input area; everything below it goes too, each branch redraws its footer
+        self.stdscr.move(12, 2)
+        self.stdscr.clrtobot()
 
         if field_name == "Password":
             # Special handling for password
             show_password = False
-            input_value = ""
+            # Edited in place; only printable ASCII is accepted, so bytes suffice
+            input_value = bytearray()
             cursor_pos = 0
+            # Hints don't change while typing, draw them once
+            self.draw_footer((
+                "[←→] - Move cursor",
+                "[V] - Show/hide",
+                "[G] - Generate",
+                "[Enter] - Save",
+                "[Esc] - Cancel"
+            ))
+            # The current password only changes on show/hide, its mask is built once
+            current_masked = masked(len(current_value))
+            prev_show = None
+            # The prompt stays put, only the field after it is rewritten
+            self.stdscr.move(13, 2)
+            self.stdscr.clrtoeol()
+            input_prompt = "New password: "
+            self.stdscr.addstr(13, 2, input_prompt)
+            input_x = 2 + len(input_prompt)
+            prev_display = None
             
             while True:
-                self.stdscr.move(12, 2)
-                self.stdscr.clrtoeol()
-                prompt = f"Current password: "
-                self.stdscr.addstr(12, 2, prompt)
-                
-                # Display current password (hidden or visible)
-                if show_password:
-                    self.stdscr.addstr(current_value)
-                else:
-                    self.stdscr.addstr('*' * len(current_value))
-                
-                # Display input area
-                self.stdscr.move(13, 2)
-                self.stdscr.clrtoeol()
-                input_prompt = "New password: "
-                self.stdscr.addstr(13, 2, input_prompt)
-                
-                # Display entered password
-                display_value = input_value if show_password else '*' * len(input_value)
-                self.stdscr.addstr(13, 2 + len(input_prompt), display_value)
-                
-                # Position cursor
-                self.stdscr.move(13, 2 + len(input_prompt) + cursor_pos)
-                
-                self.draw_footer([
-                    "[←→] - Move cursor",
-                    "[V] - Show/hide",
-                    "[G] - Generate",
-                    "[Enter] - Save",
-                    "[Esc] - Cancel"
-                ])
-                
+                # Keys arriving back to back (paste, typing ahead) are taken before redrawing
+                if not self.input_pending():
+                    if show_password != prev_show:
+                        self.stdscr.move(12, 2)
+                        self.stdscr.clrtoeol()
+                        prompt = f"Current password: "
+                        self.stdscr.addstr(12, 2, prompt)
+                    
+                        # Display current password (hidden or visible)
+                        self.stdscr.addstr(current_value if show_password else current_masked)
+                        prev_show = show_password
+                    
+                    # Display entered password, cursor moves alone leave the field as is
+                    display_value = input_value.decode('ascii') if show_password else masked(len(input_value))
+                    if display_value != prev_display:
+                        grown = prev_display is not None and len(display_value) - len(prev_display)
+                        if grown == 1 and display_value[:cursor_pos-1] + display_value[cursor_pos:] == prev_display:
+                            # One character typed before the cursor, curses shifts the rest right
+                            self.stdscr.insch(13, input_x + cursor_pos - 1, ord(display_value[cursor_pos-1]))
+                        elif grown == -1 and prev_display[:cursor_pos] + prev_display[cursor_pos+1:] == display_value:
+                            # Backspace or Delete removed the cell at the cursor
+                            self.stdscr.delch(13, input_x + cursor_pos)
+                        else:
+                            # Several edits at once, a generated password or show/hide: rewrite the field
+                            self.stdscr.addstr(13, input_x, display_value)
+                            self.stdscr.clrtoeol()
+                        prev_display = display_value
+                    
+                    # Position cursor
+                    self.stdscr.move(13, input_x + cursor_pos)
+                    self.refresh()
+                    
                 key = self.stdscr.getch()
+                action = KEY_TO_ACTION.get(key)
                 
-                if key in [ord('v'), ord('V')]:
+                if key in TOGGLE_KEYS:
                     show_password = not show_password
-                elif key in [ord('g'), ord('G')]:
-                    input_value = self.password_generator.generate_password()
+                elif key in GENERATE_KEYS:
+                    input_value = bytearray(self.password_generator.generate_password().encode('ascii'))
                     cursor_pos = len(input_value)
                 elif key == 27:  # Escape
                     return
-                elif key in [10, 13]:  # Enter
+                elif key in ENTER_KEYS:  # Enter
                     if input_value:
-                        self.entry[field_map[field_name]] = input_value
+                        self.entry[FIELD_MAP[field_name]] = input_value.decode('ascii')
                     return
-                elif key == curses.KEY_BACKSPACE or key == 127 or key == 8:
-                    if cursor_pos > 0:
-                        input_value = input_value[:cursor_pos-1] + input_value[cursor_pos:]
-                        cursor_pos -= 1
-                elif key == curses.KEY_DC:  # Delete
-                    if cursor_pos < len(input_value):
-                        input_value = input_value[:cursor_pos] + input_value[cursor_pos+1:]
-                elif key == curses.KEY_LEFT and cursor_pos > 0:
-                    cursor_pos -= 1
-                elif key == curses.KEY_RIGHT and cursor_pos < len(input_value):
+                elif action in EDIT_ACTIONS:
+                    cursor_pos = apply_edit(action, input_value, cursor_pos)
+                elif key in PRINTABLE_KEYS and len(input_value) < 50:
+                    input_value.insert(cursor_pos, key)
                     cursor_pos += 1
-                elif key == curses.KEY_HOME:
-                    cursor_pos = 0
-                elif key == curses.KEY_END:
-                    cursor_pos = len(input_value)
-                elif 32 <= key <= 126 and len(input_value) < 50:  # Printable characters
-                    input_value = input_value[:cursor_pos] + chr(key) + input_value[cursor_pos:]
-                    cursor_pos += 1
-                
-                self.refresh()
         elif field_name == "Note":
             show_note = False
-            value = current_value
-            cursor_pos = len(value)
+            buf = list(current_value)
+            cursor_pos = len(buf)
+            # Kept up to date per edit instead of re-scanning the note on each key
+            word_count = len(WORD_RE.findall(current_value))
+            self.draw_footer(("[V] - Show/hide", "[Enter] - Save", "[Esc] - Cancel"))
             while True:
-                self.stdscr.move(12, 2)
-                self.stdscr.clrtoeol()
-                prompt = "Current note: "
-                display_note = value if show_note else '*' * min(len(value), 30)
-                self.stdscr.addstr(12, 2, prompt + display_note[:self.width-20])
-                self.stdscr.move(13, 2)
-                self.stdscr.clrtoeol()
-                input_prompt = "New note (up to 50 words): "
-                self.stdscr.addstr(13, 2, input_prompt)
-                self.stdscr.addstr(13, 2 + len(input_prompt), value[:self.width-20])
-                self.stdscr.move(13, 2 + len(input_prompt) + cursor_pos)
-                self.draw_footer(["[V] - Show/hide", "[Enter] - Save", "[Esc] - Cancel"])
+                # Keys arriving back to back (paste, typing ahead) are taken before redrawing
+                if not self.input_pending():
+                    value = ''.join(buf)
+                    self.stdscr.move(12, 2)
+                    self.stdscr.clrtoeol()
+                    prompt = "Current note: "
+                    display_note = value if show_note else masked(min(len(value), 30))
+                    self.stdscr.addstr(12, 2, prompt + display_note[:self.width-20])
+                    self.stdscr.move(13, 2)
+                    self.stdscr.clrtoeol()
+                    input_prompt = "New note (up to 50 words): "
+                    self.stdscr.addstr(13, 2, input_prompt)
+                    self.stdscr.addstr(13, 2 + len(input_prompt), value[:self.width-20])
+                    self.stdscr.move(13, 2 + len(input_prompt) + cursor_pos)
+                    self.refresh()
                 key = self.stdscr.getch()
-                if key in [ord('v'), ord('V')]:
+                action = KEY_TO_ACTION.get(key)
+                if key in TOGGLE_KEYS:
                     show_note = not show_note
                 elif key == 27:
                     return
-                elif key in [10, 13]:
+                elif key in ENTER_KEYS:
                     # Ограничение по словам
-                    words = re.findall(r'\S+', value)
+                    value = ''.join(buf)
+                    words = WORD_RE.findall(value)
                     if len(words) > 50:
                         value = ' '.join(words[:50])
-                    self.entry[field_map[field_name]] = value
+                    self.entry[FIELD_MAP[field_name]] = value
                     return
-                elif key == curses.KEY_BACKSPACE or key == 127 or key == 8:
-                    if cursor_pos > 0:
-                        value = value[:cursor_pos-1] + value[cursor_pos:]
-                        cursor_pos -= 1
-                elif key == curses.KEY_DC:
-                    if cursor_pos < len(value):
-                        value = value[:cursor_pos] + value[cursor_pos+1:]
-                elif key == curses.KEY_LEFT and cursor_pos > 0:
-                    cursor_pos -= 1
-                elif key == curses.KEY_RIGHT and cursor_pos < len(value):
+                elif action in EDIT_ACTIONS:
+                    # Account for the character about to be removed
+                    if action == 'backspace' and cursor_pos > 0:
+                        word_count -= _word_change(buf, cursor_pos - 1)
+                    elif action == 'delete' and cursor_pos < len(buf):
+                        word_count -= _word_change(buf, cursor_pos)
+                    cursor_pos = apply_edit(action, buf, cursor_pos)
+                elif key in PRINTABLE_KEYS and word_count < 50:
+                    buf.insert(cursor_pos, chr(key))
+                    word_count += _word_change(buf, cursor_pos)
                     cursor_pos += 1
-                elif key == curses.KEY_HOME:
-                    cursor_pos = 0
-                elif key == curses.KEY_END:
-                    cursor_pos = len(value)
-                elif 32 <= key <= 126 and len(re.findall(r'\S+', value)) < 50:
-                    value = value[:cursor_pos] + chr(key) + value[cursor_pos:]
-                    cursor_pos += 1
-                self.refresh()
         else:
             # For other fields, show current value and allow editing
             self.stdscr.addstr(12, 2, f"Current value: {current_value}")
@@ -406,4 +558,4 @@ class EditEntryWindow(BaseWindow):
             value = self.get_string_input(f"New value: ", 13, 2, max_length=max_length)
             
             if value:
-                self.entry[field_map[field_name]] = value 
\ No newline at end of file
+                self.entry[FIELD_MAP[field_name]] = value 
\ No newline at end of file
@@ -1,6 +1,12 @@
 import curses
 from .base import BaseWindow
 
+# Toggle items of the settings menu, in menu order after the length item
+TOGGLE_ATTRIBUTES = ("include_lowercase", "include_uppercase", "include_digits", "include_special")
+# Labels of the toggle items, in the same order
+TOGGLE_LABELS = ("Lowercase Letters", "Uppercase Letters", "Digits", "Special Characters")
+YES_NO = {True: "Yes", False: "No"}
+
 class PasswordGeneratorWindow(BaseWindow):
     """Password Generator Window"""
     
@@ -16,24 +22,13 @@ class PasswordGeneratorWindow(BaseWindow):
         self.include_special = True
         self.config_mode = False
         self.config_index = 0
-        self.config_items = [
-            f"Password Length: {self.password_length}",
-            f"Lowercase Letters: {'Yes' if self.include_lowercase else 'No'}",
-            f"Uppercase Letters: {'Yes' if self.include_uppercase else 'No'}",
-            f"Digits: {'Yes' if self.include_digits else 'No'}",
-            f"Special Characters: {'Yes' if self.include_special else 'No'}",
-            "Generate Password",
-            "Back"
-        ]
+        self.update_config_items()
     
     def update_config_items(self):
         """Update Configuration Items"""
         self.config_items = [
             f"Password Length: {self.password_length}",
-            f"Lowercase Letters: {'Yes' if self.include_lowercase else 'No'}",
-            f"Uppercase Letters: {'Yes' if self.include_uppercase else 'No'}",
-            f"Digits: {'Yes' if self.include_digits else 'No'}",
-            f"Special Characters: {'Yes' if self.include_special else 'No'}",
+            *(f"{label}: {YES_NO[getattr(self, attr)]}" for label, attr in zip(TOGGLE_LABELS, TOGGLE_ATTRIBUTES)),
             "Generate Password",
             "Back"
         ]
@@ -68,10 +63,10 @@ class PasswordGeneratorWindow(BaseWindow):
                 self.clear()
                 self.draw_header("Password Generator")
                 if self.config_mode:
-                    self.draw_footer(["[↑↓] - Navigation", "[Enter] - Select", "[Esc] - Back", "[←→] - Change"])
+                    self.draw_footer(("[↑↓] - Navigation", "[Enter] - Select", "[Esc] - Back", "[←→] - Change"))
                     self.draw_menu(self.config_items, self.config_index)
                 else:
-                    self.draw_footer(["[c] - Copy", "[g] - New Password", "[s] - Settings", "[Esc] - Back"])
+                    self.draw_footer(("[c] - Copy", "[g] - New Password", "[s] - Settings", "[Esc] - Back"))
                     if self.password:
                         password_msg = f"Generated Password: {self.password}"
                         self.draw_message(password_msg, self.height // 2 - 1, None, 3)
@@ -103,8 +98,7 @@ class PasswordGeneratorWindow(BaseWindow):
                     elif self.config_index == 0:  # Password Length
                         pass  # Handled by left/right keys
                     else:  # Toggle switches
-                        attribute_names = ["include_lowercase", "include_uppercase", "include_digits", "include_special"]
-                        attr_name = attribute_names[self.config_index - 1]
+                        attr_name = TOGGLE_ATTRIBUTES[self.config_index - 1]
                         setattr(self, attr_name, not getattr(self, attr_name))
                         self.update_config_items()
                         dirty = True
@@ -134,7 +128,5 @@ class PasswordGeneratorWindow(BaseWindow):
                 elif key == 27:
                     return None
             if key == curses.KEY_RESIZE:
-                self.resize()
-                dirty = True
-            if self.config_index != prev_config_index or self.config_mode != prev_config_mode or self.password != prev_password or (self.height, self.width) != prev_size or dirty:
-                continue 
\ No newline at end of file
+                if self.resize():
+                    dirty = True
\ No newline at end of file
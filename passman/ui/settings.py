@@ -1,14 +1,20 @@
 import curses
-from .base import BaseWindow
+import hmac
+from .base import BaseWindow, DISMISS_KEYS
 from .. import __version__
 
+SETTINGS_FOOTER = (f"Passman v{__version__}", "[↑↓] - Navigation", "[Enter] - Select", "[Esc] - Back", "[←→] - Edit")
+
 class SettingsWindow(BaseWindow):
     """Settings window"""
     
-    def __init__(self, stdscr, settings):
+    def __init__(self, stdscr, settings, master_password):
         """Initialization of settings window"""
         super().__init__(stdscr)
         self.settings = settings
+        self.master_password = master_password
+        # New master password, applied by the caller when settings are saved
+        self.new_master_password = None
         self.selected_index = 0
         self.update_menu_items()
     
@@ -37,7 +43,7 @@ class SettingsWindow(BaseWindow):
             if dirty or self.selected_index != prev_selected or (self.height, self.width) != prev_size or self.menu_items != prev_menu:
                 self.clear()
                 self.draw_header("Settings")
-                self.draw_footer([f"Passman v{__version__}", "[↑↓] - Navigation", "[Enter] - Select", "[Esc] - Back", "[←→] - Edit"])
+                self.draw_footer(SETTINGS_FOOTER)
                 self.draw_menu(self.menu_items, self.selected_index)
                 self.refresh()
                 prev_selected = self.selected_index
@@ -52,9 +58,9 @@ class SettingsWindow(BaseWindow):
             elif key == 10 or key == 13:  # Enter
                 if self.selected_index == 2:  # Change master password
                     if self.change_master_password():
-                        self.draw_message("Master password successfully changed", color_pair=3)
-                        self.stdscr.refresh()
-                        self.wait_for_key([10, 13, 27])  # Enter or Escape
+                        self.draw_message("Master password will be changed on save", color_pair=3)
+                        self.refresh()
+                        self.wait_for_key(DISMISS_KEYS)  # Enter or Escape
                         dirty = True
                 elif self.selected_index == 3:  # Export data
                     return "__EXPORT__"
@@ -95,16 +101,14 @@ class SettingsWindow(BaseWindow):
                     self.update_menu_items()
                     dirty = True
             elif key == curses.KEY_RESIZE:
-                self.resize()
-                dirty = True
-            if self.selected_index != prev_selected or (self.height, self.width) != prev_size or self.menu_items != prev_menu or dirty:
-                continue
+                if self.resize():
+                    dirty = True
     
     def change_master_password(self):
         """Change master password"""
         self.clear()
         self.draw_header("Change master password")
-        self.draw_footer(["[Enter] - Save", "[Esc] - Cancel"])
+        self.draw_footer(("[Enter] - Save", "[Esc] - Cancel"))
         
         # Ask for current password
         current_password = self.get_string_input("Current password: ", 3, 2, mask=True)
@@ -112,10 +116,10 @@ class SettingsWindow(BaseWindow):
             return False
             
         # Check if current password matches master password
-        if current_password != self.settings.get("master_password", ""):
+        if not hmac.compare_digest(current_password.encode('utf-8'), self.master_password):
             self.draw_message("Incorrect password", self.height // 2, None, 4)
-            self.stdscr.refresh()
-            self.wait_for_key([10, 13, 27])  # Enter or Escape
+            self.refresh()
+            self.wait_for_key(DISMISS_KEYS)  # Enter or Escape
             return False
         
         # Ask for new password
@@ -129,12 +133,12 @@ class SettingsWindow(BaseWindow):
             return False
         
         # Check if new password and confirmation match
-        if new_password != confirm_password:
+        if not hmac.compare_digest(new_password.encode('utf-8'), confirm_password.encode('utf-8')):
             self.draw_message("Passwords do not match", self.height // 2, None, 4)
-            self.stdscr.refresh()
-            self.wait_for_key([10, 13, 27])  # Enter or Escape
+            self.refresh()
+            self.wait_for_key(DISMISS_KEYS)  # Enter or Escape
             return False
         
         # Set new password
-        self.settings["master_password"] = new_password
+        self.new_master_password = new_password
         return True 
\ No newline at end of file
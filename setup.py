@@ -9,12 +9,13 @@ setup(
     packages=find_packages(),
     license="MIT",
     install_requires=[
-        "python-gnupg>=0.5.0",
         "pyperclip>=1.8.2",
         "cryptography>=41.0.0",
     ],
     extras_require={
         "windows": ["windows-curses"],
+        "legacy": ["python-gnupg>=0.5.0"],
+        "fast": ["orjson>=3.0", "zstandard>=0.20"],
     },
     entry_points={
         "console_scripts": [